@@ -50,6 +50,10 @@ setup(
             "psycopg2-binary>=2.8.0",
             "sqlalchemy>=1.4.0",
         ],
+        "fast": [
+            "orjson>=3.0.0",
+            "pyarrow>=10.0.0",
+        ],
         "full": [
             "pymysql>=1.0.0",
             "psycopg2-binary>=2.8.0",
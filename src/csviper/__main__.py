@@ -5,6 +5,7 @@ CSViper CLI - Main entry point
 
 import os
 import sys
+import logging
 import click
 from .metadata_extractor import CSVMetadataExtractor
 from .script_invoker import CompiledScriptInvoker
@@ -13,14 +14,20 @@ from .exceptions import CSViperError
 
 @click.group()
 @click.version_option(version="0.1.0")
-def cli():
+@click.option('--debug', is_flag=True, default=False,
+              help='Show detailed progress messages while analyzing CSV files')
+def cli(debug):
     """
     CSViper - CSV to SQL import tool
     
     Analyzes CSV files and generates SQL scripts and Python import programs
     for loading data into relational databases (MySQL and PostgreSQL).
     """
-    pass
+    # Progress messages are logged; show them on stdout like the rest of the CLI output
+    if debug:
+        logging.basicConfig(level=logging.DEBUG, format='%(levelname)s: %(message)s', stream=sys.stdout)
+    else:
+        logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
 
 
 @cli.command()
@@ -92,8 +99,8 @@ def build_sql(from_metadata_json, output_dir, overwrite_previous):
         # Determine output directory if not specified
         if not output_dir:
             output_dir = os.path.dirname(metadata_path)
-        
-        output_dir = os.path.abspath(output_dir)
+        else:
+            output_dir = os.path.abspath(output_dir)
         
         click.echo(f"Generating SQL scripts from: {metadata_path}")
         click.echo(f"Output directory: {output_dir}")
@@ -148,8 +155,8 @@ def build_import_script(from_resource_dir, output_dir, overwrite_previous):
         # Determine output directory if not specified
         if not output_dir:
             output_dir = resource_dir
-        
-        output_dir = os.path.abspath(output_dir)
+        else:
+            output_dir = os.path.abspath(output_dir)
         
         click.echo(f"Generating import scripts from: {resource_dir}")
         click.echo(f"Output directory: {output_dir}")
@@ -197,7 +204,11 @@ def build_import_script(from_resource_dir, output_dir, overwrite_previous):
                 help='Limit the import to a specific number of lines')
 @click.option('--trample', is_flag=True, default=False,
                 help='Trample existing data in the table')
-def invoke_compiled_script(run_import_from, import_data_from_dir, database_type, db_schema_name, table_name, import_only_lines, trample):
+@click.option('--assume_yes', is_flag=True, default=False,
+                help='Use the latest matching file without asking for confirmation')
+@click.option('--replace_process', is_flag=True, default=False,
+                help='Run the import script in place of this process instead of as a child process')
+def invoke_compiled_script(run_import_from, import_data_from_dir, database_type, db_schema_name, table_name, import_only_lines, trample, assume_yes, replace_process):
     """
     Execute compiled import scripts with automatic file discovery.
     
@@ -217,7 +228,9 @@ def invoke_compiled_script(run_import_from, import_data_from_dir, database_type,
             db_schema_name=db_schema_name,
             table_name=table_name,
             import_only_lines=import_only_lines,
-            trample=trample
+            trample=trample,
+            replace_process=replace_process,
+            assume_yes=assume_yes
         )
         
     except CSViperError as e:
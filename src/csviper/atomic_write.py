@@ -0,0 +1,37 @@
+"""
+Atomic file writes for CSViper's generated SQL and documentation files
+"""
+
+import os
+
+
+def write_bytes_atomic(path: str, data: bytes) -> None:
+    """
+    Atomically write already-encoded content to a file through a raw file descriptor.
+    
+    Skips the text-mode wrapper and its buffer; the whole payload normally
+    goes out in a single write call. The data is written to a temporary file
+    next to the target and renamed over it, so concurrent generators sharing
+    a cache directory never see a partly written file. No fsync is done.
+    
+    Args:
+        path (str): File to create or replace
+        data (bytes): Content to write
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -5,12 +5,47 @@ Contains shared functionality between database-specific schema generators.
 
 import os
 import json
+import shutil
+import stat
 import hashlib
-import glob
-from typing import Dict, Any, List
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Set
 from .post_import_sql_generator import PostImportSQLGenerator
+from .atomic_write import write_bytes_atomic
 from .exceptions import CSVFileError, MetadataError, SQLGenerationError, FileSystemError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Marker on the first line of a CREATE TABLE file, and how much to read to find it
+_OVERWRITE_COMMENT_PREFIX = b'-- OverwriteThisOnNextCompile='
+_OVERWRITE_PREFIX_READ_BYTES = 128
+
+# Line after the overwrite marker recording the structure hash the file was built from
+_CONTENT_HASH_PREFIX = b'-- ContentHash='
+_CONTENT_HASH_READ_BYTES = 256
+
+# File name suffix for each database type; types not listed use their own name
+_DB_FILE_EXTENSIONS = {
+    'postgresql': 'postgres'
+}
+
+# Metadata keys fromMetadataToSQL cannot work without
+_REQUIRED_METADATA_FIELDS = frozenset({
+    'filename_without_extension', 'normalized_column_names', 'max_column_lengths'
+})
+
+# Directories already created by this process
+_CREATED_DIRS: Set[str] = set()
+
+# Results of fromMetadataToSQL in this process, keyed on the metadata file's
+# identity and the generation options
+_RESULT_CACHE: Dict[tuple, Dict[str, str]] = {}
+
 
 class BaseSchemaGenerator:
     """
@@ -39,107 +74,206 @@ class BaseSchemaGenerator:
             ValueError: If metadata JSON is invalid
         """
         # Validate metadata file
-        if not os.path.isfile(metadata_json_path):
+        try:
+            metadata_stat = os.stat(metadata_json_path)
+        except OSError:
+            metadata_stat = None
+        if metadata_stat is None or not stat.S_ISREG(metadata_stat.st_mode):
             raise FileNotFoundError(f"Metadata JSON file not found: {metadata_json_path}")
         
-        # Load metadata
-        with open(metadata_json_path, 'r', encoding='utf-8') as f:
-            metadata = json.load(f)
+        # Reuse the result of an identical earlier call in this process, as long
+        # as the metadata is unchanged and the generated files are still there
+        result_key = (metadata_json_path, metadata_stat.st_mtime_ns, metadata_stat.st_size,
+                      output_dir, db_type, overwrite_previous)
+        cached_result = _RESULT_CACHE.get(result_key)
+        if cached_result is not None and all(os.path.exists(p) for p in cached_result.values()):
+            print(f"{db_type.upper()} SQL already generated for: {metadata_json_path}")
+            return dict(cached_result)
+        
+        # Load metadata (orjson is much faster on wide tables when installed)
+        if orjson is not None:
+            with open(metadata_json_path, 'rb') as f:
+                metadata = orjson.loads(f.read())
+        else:
+            with open(metadata_json_path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
         
         # Validate that normalized column names are unique
         from .metadata_extractor import CSVMetadataExtractor
         CSVMetadataExtractor._validate_column_mapping_uniqueness(metadata)
         
         # Validate required metadata fields
-        required_fields = ['filename_without_extension', 'normalized_column_names', 'max_column_lengths']
-        for field in required_fields:
-            if field not in metadata:
-                raise ValueError(f"Required metadata field missing: {field}")
+        missing_fields = _REQUIRED_METADATA_FIELDS.difference(metadata)
+        if missing_fields:
+            raise ValueError(f"Required metadata fields missing: {', '.join(sorted(missing_fields))}")
         
         print(f"Generating {db_type.upper()} SQL for: {metadata['filename_without_extension']}")
         
+        # Generate cascading hash for caching (CSV headers + metadata content)
+        # This ensures SQL regeneration when either CSV headers or metadata content changes
+        column_md5_hash = BaseSchemaGenerator._compute_structure_hash(metadata)
+        
+        # Output file locations
+        filename_base = metadata['filename_without_extension']
+        db_extension = BaseSchemaGenerator._get_file_extension(db_type)
+        create_table_file = os.path.join(output_dir, f"{filename_base}.create_table_{db_extension}.sql")
+        import_data_file = os.path.join(output_dir, f"{filename_base}.import_data_{db_extension}.sql")
+        table_hash_dir = os.path.join(output_dir, 'post_import_sql', f"{filename_base}_{column_md5_hash}")
+        
+        result = {
+            'create_table_sql': create_table_file,
+            'import_data_sql': import_data_file,
+            'post_import_dir': table_hash_dir
+        }
+        
+        # Nothing to do if a previous run already produced output for this structure
+        if (not overwrite_previous
+                and BaseSchemaGenerator._read_content_hash(create_table_file) == column_md5_hash
+                and os.path.isfile(import_data_file)
+                and os.path.isdir(table_hash_dir)):
+            print(f"{db_type.upper()} SQL is up to date: {create_table_file}")
+            _RESULT_CACHE[result_key] = dict(result)
+            return result
+        
         # Create cache directory for CREATE TABLE SQL
         cache_dir = os.path.join(output_dir, 'cache_create_table_sql')
-        os.makedirs(cache_dir, exist_ok=True)
-        
-        # Generate cascading MD5 hash for caching (CSV headers + metadata content)
-        # This ensures SQL regeneration when either CSV headers or metadata content changes
-        csv_headers_str = ','.join([col.lower() for col in metadata['original_column_names']])
-        
-        # Create a deterministic string representation of the metadata content
-        # Include key fields that affect SQL generation
-        metadata_content_parts = [
-            ','.join(metadata['normalized_column_names']),
-            ','.join([f"{k}:{v}" for k, v in sorted(metadata['max_column_lengths'].items())]),
-            ','.join([f"{k}:{v}" for k, v in sorted(metadata['column_name_mapping'].items())]),
-            metadata['delimiter'],
-            metadata['quote_character']
-        ]
-        metadata_content_str = '|'.join(metadata_content_parts)
-        
-        # Combine CSV headers and metadata content for cascading hash
-        combined_content = f"{csv_headers_str}#{metadata_content_str}"
-        column_md5_hash = hashlib.md5(combined_content.encode()).hexdigest()
+        BaseSchemaGenerator._ensure_dir(cache_dir)
         
         # Check for cached CREATE TABLE SQL
-        create_table_sql = BaseSchemaGenerator._get_or_create_table_sql(
+        create_table_cache_file = BaseSchemaGenerator._get_or_create_table_sql(
             metadata, cache_dir, column_md5_hash, overwrite_previous, db_type, generator_class
         )
         
         # Generate data import SQL with caching
-        import_sql = BaseSchemaGenerator._get_or_create_import_sql(
+        import_cache_file = BaseSchemaGenerator._get_or_create_import_sql(
             metadata, output_dir, column_md5_hash, overwrite_previous, db_type, generator_class
         )
         
-        # Write SQL files to output directory
-        filename_base = metadata['filename_without_extension']
-        
-        # Determine file extensions based on database type
-        db_extension = BaseSchemaGenerator._get_file_extension(db_type)
-        create_table_file = os.path.join(output_dir, f"{filename_base}.create_table_{db_extension}.sql")
-        import_data_file = os.path.join(output_dir, f"{filename_base}.import_data_{db_extension}.sql")
-        
         # Check if CREATE TABLE file should be overwritten
         should_write_create_table = BaseSchemaGenerator._should_overwrite_create_table_file(
             create_table_file, overwrite_previous
         )
         
-        # Write CREATE TABLE SQL only if allowed
+        # Copy CREATE TABLE SQL from the cache only if allowed. The output is a
+        # separate copy, not a link, because users may edit it in place.
         if should_write_create_table:
-            with open(create_table_file, 'w', encoding='utf-8') as f:
-                f.write(create_table_sql)
+            BaseSchemaGenerator._copy_file(create_table_cache_file, create_table_file)
             print(f"Generated {db_type.upper()} CREATE TABLE SQL: {create_table_file}")
         else:
             print(f"Skipping {db_type.upper()} CREATE TABLE SQL (already exists and not set to overwrite): {create_table_file}")
         
-        # Write IMPORT DATA SQL
-        with open(import_data_file, 'w', encoding='utf-8') as f:
-            f.write(import_sql)
+        # Copy IMPORT DATA SQL from the cache
+        BaseSchemaGenerator._copy_file(import_cache_file, import_data_file)
         
         print(f"Generated {db_type.upper()} IMPORT DATA SQL: {import_data_file}")
         
-        # Create post-import SQL directory structure
-        post_import_dir = os.path.join(output_dir, 'post_import_sql')
-        os.makedirs(post_import_dir, exist_ok=True)
-        
-        # Create subdirectory for this specific table structure
-        table_hash_dir = os.path.join(post_import_dir, f"{filename_base}_{column_md5_hash}")
-        os.makedirs(table_hash_dir, exist_ok=True)
+        # Create post-import SQL directory and the subdirectory for this specific table structure
+        BaseSchemaGenerator._ensure_dir(table_hash_dir)
         
         # Create a README file explaining the post-import SQL structure
         readme_path = os.path.join(table_hash_dir, 'README.md')
         if not os.path.exists(readme_path):
             readme_content = PostImportSQLGenerator.load_readme_template(db_type, filename_base)
-            with open(readme_path, 'w', encoding='utf-8') as f:
-                f.write(readme_content)
+            write_bytes_atomic(readme_path, readme_content.encode('utf-8'))
         
         print(f"Created post-import SQL directory: {table_hash_dir}")
         
-        return {
-            'create_table_sql': create_table_file,
-            'import_data_sql': import_data_file,
-            'post_import_dir': table_hash_dir
-        }
+        _RESULT_CACHE[result_key] = dict(result)
+        return result
+    
+    @staticmethod
+    def fromMetadataListToSQL(metadata_json_paths: List[str], output_dir: str, overwrite_previous: bool = False,
+                              db_type: str = "", generator_class=None,
+                              max_workers: Optional[int] = None) -> Dict[str, Dict[str, str]]:
+        """
+        Generate SQL scripts for several metadata JSON files in parallel.
+        
+        Each file is handled by fromMetadataToSQL in a separate worker process,
+        since the work for one file does not depend on any other.
+        
+        Args:
+            metadata_json_paths (List[str]): Paths to the metadata JSON files
+            output_dir (str): Output directory for SQL files
+            overwrite_previous (bool): Whether to overwrite existing files
+            db_type (str): Database type identifier for file naming
+            generator_class: The specific generator class with SQL generation methods
+            max_workers (Optional[int]): Number of worker processes (defaults to CPU count)
+            
+        Returns:
+            Dict[str, Dict[str, str]]: Generated file paths for each metadata JSON path
+            
+        Raises:
+            FileNotFoundError: If a metadata JSON file does not exist
+            ValueError: If a metadata JSON file is invalid
+        """
+        if len(metadata_json_paths) <= 1:
+            return {
+                path: BaseSchemaGenerator.fromMetadataToSQL(
+                    path, output_dir, overwrite_previous, db_type, generator_class
+                )
+                for path in metadata_json_paths
+            }
+        
+        workers = min(max_workers or os.cpu_count() or 1, len(metadata_json_paths))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                path: executor.submit(
+                    BaseSchemaGenerator.fromMetadataToSQL,
+                    path, output_dir, overwrite_previous, db_type, generator_class
+                )
+                for path in metadata_json_paths
+            }
+            return {path: future.result() for path, future in futures.items()}
+    
+    @staticmethod
+    def _compute_structure_hash(metadata: Dict[str, Any]) -> str:
+        """
+        Compute the cache key for generated SQL from CSV headers and metadata content.
+        
+        Pieces are fed to the hasher one at a time instead of being joined into a
+        single string first. The bytes hashed are the same as for
+        "<headers>#<normalized>|<lengths>|<mapping>|<delimiter>|<quote>" and the
+        digest is MD5, so the names of existing cache files and post-import
+        directories stay valid.
+        
+        Args:
+            metadata (Dict[str, Any]): CSV metadata
+            
+        Returns:
+            str: 32-character hex digest
+        """
+        hasher = hashlib.md5()
+        
+        def update_joined(items, separator=b','):
+            for i, item in enumerate(items):
+                if i:
+                    hasher.update(separator)
+                hasher.update(item.encode())
+        
+        def update_pairs(mapping):
+            # Same bytes as joining f"{k}:{v}" over the sorted items, without
+            # building each string
+            for i, (key, value) in enumerate(sorted(mapping.items(), key=itemgetter(0))):
+                if i:
+                    hasher.update(b',')
+                hasher.update(key.encode())
+                hasher.update(b':')
+                hasher.update(str(value).encode())
+        
+        update_joined(map(str.lower, metadata['original_column_names']))
+        hasher.update(b'#')
+        # Key fields that affect SQL generation
+        update_joined(metadata['normalized_column_names'])
+        hasher.update(b'|')
+        update_pairs(metadata['max_column_lengths'])
+        hasher.update(b'|')
+        update_pairs(metadata['column_name_mapping'])
+        hasher.update(b'|')
+        hasher.update(metadata['delimiter'].encode())
+        hasher.update(b'|')
+        hasher.update(metadata['quote_character'].encode())
+        
+        return hasher.hexdigest()
     
     @staticmethod
     def _get_file_extension(db_type: str) -> str:
@@ -152,18 +286,14 @@ class BaseSchemaGenerator:
         Returns:
             str: File extension for the database type
         """
-        extension_map = {
-            'mysql': 'mysql',
-            'postgresql': 'postgres'
-        }
-        return extension_map.get(db_type, db_type)
+        return _DB_FILE_EXTENSIONS.get(db_type, db_type)
     
     @staticmethod
     def _get_or_create_table_sql(metadata: Dict[str, Any], cache_dir: str, 
                                 column_md5_hash: str, overwrite_previous: bool, 
                                 db_type: str, generator_class) -> str:
         """
-        Get CREATE TABLE SQL from cache or generate new one.
+        Get the cached CREATE TABLE SQL file, generating it if needed.
         
         Args:
             metadata (Dict[str, Any]): CSV metadata
@@ -174,46 +304,46 @@ class BaseSchemaGenerator:
             generator_class: The specific generator class with SQL generation methods
             
         Returns:
-            str: CREATE TABLE SQL statement
+            str: Path to the cached CREATE TABLE SQL file
         """
         # Determine file extension based on database type
         db_extension = BaseSchemaGenerator._get_file_extension(db_type)
         
-        # Look for cached CREATE TABLE SQL
-        cache_pattern = os.path.join(cache_dir, f"{column_md5_hash}.*.{db_extension}.sql")
-        cache_files = glob.glob(cache_pattern)
+        filename_base = metadata.get('filename_without_extension', 'unknown')
+        cache_file = os.path.join(cache_dir, f"{column_md5_hash}.create_table.{filename_base}.{db_extension}.sql")
         
-        if cache_files and not overwrite_previous:
-            # Use cached version
-            cache_file = cache_files[0]
-            print(f"Using cached {db_type.upper()} CREATE TABLE SQL: {os.path.basename(cache_file)}")
-            
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                return f.read()
+        # Look for cached CREATE TABLE SQL
+        if not overwrite_previous:
+            cached_file = BaseSchemaGenerator._find_cached_sql_file(
+                cache_dir, cache_file, column_md5_hash, db_extension
+            )
+            if cached_file:
+                # Use cached version
+                print(f"Using cached {db_type.upper()} CREATE TABLE SQL: {os.path.basename(cached_file)}")
+                return cached_file
         
         # Generate new CREATE TABLE SQL
         print(f"Generating new {db_type.upper()} CREATE TABLE SQL...")
         
-        # Use database-specific method to generate CREATE TABLE SQL
+        # Use database-specific method to generate CREATE TABLE SQL, and record
+        # the structure hash on the line after the overwrite marker
         full_sql = generator_class._generate_create_table_sql(metadata)
+        marker_line, _, rest = full_sql.partition('\n')
+        full_sql = f"{marker_line}\n{_CONTENT_HASH_PREFIX.decode()}{column_md5_hash}\n{rest}"
         
         # Cache the generated SQL
-        filename_base = metadata.get('filename_without_extension', 'unknown')
-        cache_file = os.path.join(cache_dir, f"{column_md5_hash}.create_table.{filename_base}.{db_extension}.sql")
-        
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            f.write(full_sql)
+        write_bytes_atomic(cache_file, full_sql.encode('utf-8'))
         
         print(f"Cached {db_type.upper()} CREATE TABLE SQL: {os.path.basename(cache_file)}")
         
-        return full_sql
+        return cache_file
     
     @staticmethod
     def _get_or_create_import_sql(metadata: Dict[str, Any], output_dir: str, 
                                  column_md5_hash: str, overwrite_previous: bool, 
                                  db_type: str, generator_class) -> str:
         """
-        Get IMPORT DATA SQL from cache or generate new one.
+        Get the cached IMPORT DATA SQL file, generating it if needed.
         
         Args:
             metadata (Dict[str, Any]): CSV metadata
@@ -224,26 +354,27 @@ class BaseSchemaGenerator:
             generator_class: The specific generator class with SQL generation methods
             
         Returns:
-            str: IMPORT DATA SQL statement
+            str: Path to the cached IMPORT DATA SQL file
         """
         # Create cache directory for import data SQL
         cache_dir = os.path.join(output_dir, 'cache_import_data_sql')
-        os.makedirs(cache_dir, exist_ok=True)
+        BaseSchemaGenerator._ensure_dir(cache_dir)
         
         # Determine file extension based on database type
         db_extension = BaseSchemaGenerator._get_file_extension(db_type)
         
-        # Look for cached IMPORT DATA SQL
-        cache_pattern = os.path.join(cache_dir, f"{column_md5_hash}.*.{db_extension}.sql")
-        cache_files = glob.glob(cache_pattern)
+        filename_base = metadata.get('filename_without_extension', 'unknown')
+        cache_file = os.path.join(cache_dir, f"{column_md5_hash}.import_data.{filename_base}.{db_extension}.sql")
         
-        if cache_files and not overwrite_previous:
-            # Use cached version
-            cache_file = cache_files[0]
-            print(f"Using cached {db_type.upper()} IMPORT DATA SQL: {os.path.basename(cache_file)}")
-            
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                return f.read()
+        # Look for cached IMPORT DATA SQL
+        if not overwrite_previous:
+            cached_file = BaseSchemaGenerator._find_cached_sql_file(
+                cache_dir, cache_file, column_md5_hash, db_extension
+            )
+            if cached_file:
+                # Use cached version
+                print(f"Using cached {db_type.upper()} IMPORT DATA SQL: {os.path.basename(cached_file)}")
+                return cached_file
         
         # Generate new IMPORT DATA SQL
         print(f"Generating new {db_type.upper()} IMPORT DATA SQL...")
@@ -252,15 +383,97 @@ class BaseSchemaGenerator:
         import_sql = generator_class._generate_import_sql(metadata)
         
         # Cache the generated SQL
-        filename_base = metadata.get('filename_without_extension', 'unknown')
-        cache_file = os.path.join(cache_dir, f"{column_md5_hash}.import_data.{filename_base}.{db_extension}.sql")
-        
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            f.write(import_sql)
+        write_bytes_atomic(cache_file, import_sql.encode('utf-8'))
         
         print(f"Cached {db_type.upper()} IMPORT DATA SQL: {os.path.basename(cache_file)}")
         
-        return import_sql
+        return cache_file
+    
+    @staticmethod
+    def _ensure_dir(path: str) -> None:
+        """
+        Create a directory (and parents) unless this process already did so.
+        
+        Args:
+            path (str): Directory to create
+        """
+        if path not in _CREATED_DIRS:
+            os.makedirs(path, exist_ok=True)
+            _CREATED_DIRS.add(path)
+    
+    @staticmethod
+    def _copy_file(src: str, dst: str) -> None:
+        """
+        Atomically replace dst with a copy of src.
+        
+        Args:
+            src (str): File to copy
+            dst (str): File to create or replace
+        """
+        tmp_path = f"{dst}.{os.getpid()}.tmp"
+        try:
+            shutil.copyfile(src, tmp_path)
+            os.replace(tmp_path, dst)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+    
+    @staticmethod
+    def _find_cached_sql_file(cache_dir: str, expected_path: str, column_md5_hash: str,
+                              db_extension: str) -> Optional[str]:
+        """
+        Locate a cached SQL file for the given structure hash.
+        
+        The file written by this generator has a predictable name, so it is probed
+        directly first. Otherwise the cache directory is scanned once for any
+        "<hash>.*.<extension>.sql" entry (e.g. cached under another CSV basename).
+        
+        Args:
+            cache_dir (str): Cache directory path
+            expected_path (str): Path the cache file would have for this CSV
+            column_md5_hash (str): Hash of column structure
+            db_extension (str): Database file extension
+            
+        Returns:
+            Optional[str]: Path to a cached SQL file, or None if there is none
+        """
+        if os.path.isfile(expected_path):
+            return expected_path
+        
+        prefix = f"{column_md5_hash}."
+        suffix = f".{db_extension}.sql"
+        with os.scandir(cache_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if (name.startswith(prefix) and name.endswith(suffix)
+                        and len(name) >= len(prefix) + len(suffix)):
+                    return entry.path
+        return None
+    
+    @staticmethod
+    def _read_content_hash(create_table_file_path: str) -> Optional[str]:
+        """
+        Read the structure hash stamped into a generated CREATE TABLE file.
+        
+        Args:
+            create_table_file_path (str): Path to the CREATE TABLE SQL file
+            
+        Returns:
+            Optional[str]: The hash, or None if the file is missing or has no stamp
+        """
+        try:
+            with open(create_table_file_path, 'rb') as f:
+                head = f.read(_CONTENT_HASH_READ_BYTES)
+        except OSError:
+            return None
+        
+        lines = head.split(b'\n', 2)
+        if len(lines) < 3 or not lines[1].startswith(_CONTENT_HASH_PREFIX):
+            return None
+        return lines[1][len(_CONTENT_HASH_PREFIX):].strip().decode('ascii', 'replace')
     
     @staticmethod
     def _should_overwrite_create_table_file(create_table_file_path: str, overwrite_previous: bool) -> bool:
@@ -282,18 +495,21 @@ class BaseSchemaGenerator:
         if not os.path.exists(create_table_file_path):
             return True
         
-        # Read the first line to check for overwrite comment
+        # Read just enough of the first line to check for overwrite comment
         try:
-            with open(create_table_file_path, 'r', encoding='utf-8') as f:
-                first_line = f.readline().strip()
+            with open(create_table_file_path, 'rb') as f:
+                head = f.read(_OVERWRITE_PREFIX_READ_BYTES)
+            
+            newline = head.find(b'\n')
+            first_line = (head if newline == -1 else head[:newline]).strip()
                 
             # Check if first line contains the overwrite comment
-            if first_line.startswith('-- OverwriteThisOnNextCompile='):
+            if first_line.startswith(_OVERWRITE_COMMENT_PREFIX):
                 # Extract the value after the equals sign
-                value = first_line.split('=', 1)[1].strip()
+                value = first_line[len(_OVERWRITE_COMMENT_PREFIX):].strip()
                 
                 # Only overwrite if the value is exactly 'True'
-                if value == 'True':
+                if value == b'True':
                     return True
                 else:
                     return False
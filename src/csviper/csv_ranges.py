@@ -0,0 +1,60 @@
+"""
+Record-aligned byte ranges of CSV files, for CSViper's parallel scans and loads
+"""
+
+import os
+from typing import List, Tuple
+
+
+# Read size while looking for range boundaries
+_BOUNDARY_SCAN_READ_SIZE = 1 << 20
+
+
+def split_csv_ranges(csv_path: str, n_chunks: int, quote_char: bytes = b'"') -> List[Tuple[int, int]]:
+    """
+    Split a CSV file into byte ranges that each end on a record boundary.
+    
+    Boundaries are placed at the first newline after each 1/n_chunks of the
+    file that is outside a quoted field, so records with embedded newlines
+    stay whole.
+    
+    Args:
+        csv_path (str): Path to the CSV file
+        n_chunks (int): Number of ranges wanted
+        quote_char (bytes): Single-byte quote character
+        
+    Returns:
+        List[Tuple[int, int]]: (start, end) byte offsets covering the file
+    """
+    file_size = os.path.getsize(csv_path)
+    targets = iter([file_size * i // n_chunks for i in range(1, n_chunks)])
+    target = next(targets, None)
+    boundaries = [0]
+    quotes = 0  # quote characters before the current block
+    offset = 0
+    
+    with open(csv_path, 'rb') as f:
+        while target is not None:
+            block = f.read(_BOUNDARY_SCAN_READ_SIZE)
+            if not block:
+                break
+            block_end = offset + len(block)
+            
+            while target is not None and target < block_end:
+                newline = block.find(b'\n', max(target, boundaries[-1]) - offset)
+                # An odd number of quotes before the newline means it's inside a field
+                while newline != -1 and (quotes + block.count(quote_char, 0, newline)) % 2:
+                    newline = block.find(b'\n', newline + 1)
+                if newline == -1:
+                    # Keep looking from the start of the next block
+                    target = block_end
+                    break
+                boundaries.append(offset + newline + 1)
+                while target is not None and target < boundaries[-1]:
+                    target = next(targets, None)
+            
+            quotes += block.count(quote_char)
+            offset = block_end
+    
+    boundaries.append(file_size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
@@ -10,8 +10,15 @@ class CSViperError(Exception):
         super().__init__(message)
         self.stage = stage or "Unknown"
         self.message = message
+        self._str_cache = None
     
     def __str__(self):
+        # Errors are not changed after construction, so format them only once
+        if self._str_cache is None:
+            self._str_cache = self._format_message()
+        return self._str_cache
+    
+    def _format_message(self) -> str:
         return f"{self.stage}: {self.message}"
 
 
@@ -96,8 +103,8 @@ class ImportExecutionError(CSViperError):
         self.script_type = script_type
         self.original_error = original_error
         
-    def __str__(self):
-        base_msg = super().__str__()
+    def _format_message(self) -> str:
+        base_msg = super()._format_message()
         if self.script_type:
             base_msg = f"{base_msg} (Script Type: {self.script_type})"
         if self.original_error:
@@ -112,8 +119,8 @@ class ConfigurationError(CSViperError):
         super().__init__(message, "Configuration Error")
         self.config_type = config_type
         
-    def __str__(self):
-        base_msg = super().__str__()
+    def _format_message(self) -> str:
+        base_msg = super()._format_message()
         if self.config_type:
             base_msg = f"{base_msg} (Config Type: {self.config_type})"
         return base_msg
@@ -126,15 +133,14 @@ class DatabaseConnectionError(CSViperError):
         super().__init__(message, "Database Connection Error")
         self.db_type = db_type
         self.connection_details = connection_details or {}
+        # Only show safe connection details (no passwords)
+        self._safe_details = {k: v for k, v in self.connection_details.items() 
+                              if k.lower() not in ['password', 'passwd', 'pwd']}
         
-    def __str__(self):
-        base_msg = super().__str__()
+    def _format_message(self) -> str:
+        base_msg = super()._format_message()
         if self.db_type:
             base_msg = f"{base_msg} (Database Type: {self.db_type})"
-        if self.connection_details:
-            # Only show safe connection details (no passwords)
-            safe_details = {k: v for k, v in self.connection_details.items() 
-                          if k.lower() not in ['password', 'passwd', 'pwd']}
-            if safe_details:
-                base_msg = f"{base_msg}\nConnection Details: {safe_details}"
+        if self._safe_details:
+            base_msg = f"{base_msg}\nConnection Details: {self._safe_details}"
         return base_msg
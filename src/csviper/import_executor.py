@@ -6,12 +6,829 @@ for both MySQL and PostgreSQL databases.
 """
 
 import os
+import re
 import sys
+import time
+import atexit
+import queue
+import threading
+import functools
+import contextlib
+import gzip
 import json
 import csv
-import io
+from collections import deque
+from itertools import chain, groupby, islice
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 import click
 from dotenv import load_dotenv
+from .exceptions import ImportExecutionError, DatabaseConnectionError
+from .csv_ranges import split_csv_ranges
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Placeholders substituted into generated SQL, matched in a single pass
+_SQL_PLACEHOLDER_RE = re.compile(r'REPLACE_ME_(DB_NAME|TABLE_NAME|CSV_FULL_PATH)')
+
+# Placeholders substituted into user-written post-import SQL
+_POST_IMPORT_PLACEHOLDER_RE = re.compile(r'REPLACE_ME_(DATABASE_NAME|TABLE_NAME)')
+
+# Read size for streaming CSV data into COPY; psycopg2 defaults to 8 KiB
+_COPY_CHUNK_SIZE = 1 << 20
+
+# Packet size for LOAD DATA LOCAL INFILE uploads. Kept below 1 MiB, the smallest
+# default server max_allowed_packet, so every server accepts it.
+_LOAD_LOCAL_PACKET_SIZE = 512 * 1024
+
+# Chunks the COPY read-ahead thread may buffer ahead of the upload
+_READ_AHEAD_CHUNKS = 4
+
+# Redraw the upload progress bar at most once per this many bytes or seconds
+_PROGRESS_UPDATE_BYTES = 1 << 20
+_PROGRESS_UPDATE_SECONDS = 0.1
+
+# Directory of the generated import script driving this process, found on first use
+_CACHED_CALLER_SCRIPT_DIR = None
+
+# Pieces of SQL that can contain a semicolon without ending a statement, by dialect:
+# line and block comments, quoted strings and identifiers, and a terminating semicolon.
+# MySQL strings take backslash escapes and identifiers can be backquoted; PostgreSQL
+# strings only do in the E'...' form, and bodies can be dollar-quoted.
+_SQL_TOKEN_RES = {
+    'mysql': re.compile(
+        r"""(?P<comment>--[^\n]*|/\*.*?\*/)"""
+        r"""|'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*"|`[^`]*`"""
+        r"""|(?P<end>;)""",
+        re.S
+    ),
+    'postgresql': re.compile(
+        r"""(?P<comment>--[^\n]*|/\*.*?\*/)"""
+        r"""|(?<![\w$])[Ee]'(?:[^'\\]|\\.|'')*'|'(?:[^']|'')*'"""
+        r"""|"(?:[^"]|"")*"|\$(?P<tag>(?:[A-Za-z_]\w*)?)\$.*?\$(?P=tag)\$"""
+        r"""|(?P<end>;)""",
+        re.S
+    ),
+}
+
+
+def _iter_sql_statements(sql_content, dialect):
+    """
+    Yield the statements of a SQL script, split on top-level semicolons.
+    
+    Semicolons inside comments, quoted strings and dollar-quoted bodies don't
+    split statements. Comments before a statement are dropped, and pieces that
+    contain only comments or whitespace are skipped.
+    
+    Args:
+        sql_content (str): SQL script
+        dialect (str): 'mysql' or 'postgresql', which decides how quoted text is read
+        
+    Yields:
+        str: Each statement, stripped and without its terminating semicolon
+    """
+    code_start = None
+    position = 0
+    for match in _SQL_TOKEN_RES[dialect].finditer(sql_content):
+        # Plain SQL between the previous token and this one
+        if code_start is None:
+            gap = sql_content[position:match.start()]
+            if gap.strip():
+                code_start = position + len(gap) - len(gap.lstrip())
+        position = match.end()
+        
+        if match.group('end'):
+            if code_start is not None:
+                yield sql_content[code_start:match.start()].strip()
+                code_start = None
+        elif match.group('comment') is None and code_start is None:
+            # A quoted string or identifier starts the statement
+            code_start = match.start()
+    
+    if code_start is None and sql_content[position:].strip():
+        code_start = position
+    if code_start is not None:
+        yield sql_content[code_start:].strip()
+
+
+@functools.lru_cache(maxsize=32)
+def _split_sql_statements(sql_content, dialect):
+    """
+    Split a SQL script into statements, keeping the result for later calls in this process.
+    
+    Repeated imports send the same CREATE TABLE and post-import scripts, so
+    each script is tokenized once.
+    
+    Args:
+        sql_content (str): SQL script
+        dialect (str): 'mysql' or 'postgresql'
+        
+    Returns:
+        Tuple[str, ...]: Statements, as yielded by _iter_sql_statements
+    """
+    return tuple(_iter_sql_statements(sql_content, dialect))
+
+
+def _rollback_post_import_savepoint(connection, cursor):
+    """
+    Undo a failed post-import statement or batch, keeping the connection usable.
+    
+    Rolls back to the csviper_post_import savepoint. If that fails too (e.g. the
+    SAVEPOINT itself never ran), the whole transaction is rolled back instead,
+    which also drops the file's earlier uncommitted statements.
+    
+    Args:
+        connection: Database connection
+        cursor: Cursor the failed statement ran on
+    """
+    try:
+        cursor.execute("ROLLBACK TO SAVEPOINT csviper_post_import")
+    except Exception:
+        connection.rollback()
+
+
+@functools.lru_cache(maxsize=32)
+def _read_sql_file(sql_path):
+    """
+    Read a SQL file, keeping its content for later calls in this process.
+    
+    Args:
+        sql_path (str): Path to the SQL file
+        
+    Returns:
+        str: SQL content
+    """
+    with open(sql_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@functools.lru_cache(maxsize=32)
+def _scan_post_import_sql_files(script_dir, db_type):
+    """
+    Scan a script directory for post-import SQL files, once per directory and database type.
+    
+    Args:
+        script_dir (str): Directory containing the script
+        db_type (str): Database type ('mysql' or 'postgresql')
+        
+    Returns:
+        Tuple[Tuple[int, str], ...]: (order, filepath) tuples sorted by order
+    """
+    post_import_dir = os.path.join(script_dir, 'post_import_sql')
+    if not os.path.exists(post_import_dir):
+        return ()
+    
+    specific_files = []
+    generic_files = []
+    other_db_type = 'postgresql' if db_type == 'mysql' else 'mysql'
+    
+    # Single scandir traversal (top-down, like os.walk) collecting database-specific
+    # files and generic .sql fallbacks; DirEntry type checks need no extra stat
+    pending_dirs = [post_import_dir]
+    while pending_dirs:
+        current_dir = pending_dirs.pop()
+        subdirs = []
+        try:
+            entries = os.scandir(current_dir)
+        except OSError:
+            # Unreadable directories are skipped, as os.walk does
+            continue
+        with entries:
+            for entry in entries:
+                # Symlinked directories are not descended into, but symlinked files are read
+                if entry.is_dir() and not entry.is_symlink():
+                    subdirs.append(entry.path)
+                    continue
+                if not entry.is_file():
+                    continue
+                
+                filename = entry.name
+                if filename.endswith(f'.{db_type}.sql'):
+                    target = specific_files
+                elif filename.endswith('.sql') and not filename.endswith(f'.{other_db_type}.sql'):
+                    target = generic_files
+                else:
+                    continue
+                
+                # Extract numeric prefix
+                try:
+                    order = int(filename.partition('_')[0])
+                except ValueError:
+                    # Skip files that don't follow the naming convention
+                    continue
+                target.append((order, entry.path))
+        
+        # Visit subdirectories in listing order
+        pending_dirs.extend(reversed(subdirs))
+    
+    # Prefer database-specific files, falling back to generic .sql files
+    files_with_order = specific_files or generic_files
+    
+    # Sort by order
+    files_with_order.sort(key=itemgetter(0))
+    
+    return tuple(files_with_order)
+
+
+def _open_csv(csv_path, mode='r', **kwargs):
+    """
+    Open a CSV file, decompressing it on the fly if it is gzipped (.gz).
+    
+    Args:
+        csv_path (str): Path to the CSV file
+        mode (str): 'r' for text or 'rb' for bytes
+        **kwargs: Passed on to open() or gzip.open()
+        
+    Returns:
+        file: Open file object
+    """
+    if csv_path.endswith('.gz'):
+        return gzip.open(csv_path, mode if 'b' in mode else mode + 't', **kwargs)
+    return open(csv_path, mode, **kwargs)
+
+
+def _caller_script_dir():
+    """
+    Return the directory of the generated script that called into csviper.
+    
+    Walks up the stack to the first frame that's not in the csviper package.
+    The answer does not change during an import run, so the walk happens once.
+    
+    Returns:
+        str: Script directory, or None if no such frame was found
+    """
+    global _CACHED_CALLER_SCRIPT_DIR
+    if _CACHED_CALLER_SCRIPT_DIR is not None:
+        return _CACHED_CALLER_SCRIPT_DIR
+    
+    # sys._getframe skips the frame-object introspection inspect.currentframe does
+    frame = sys._getframe(1)
+    try:
+        while frame:
+            if '__file__' in frame.f_globals:
+                file_path = frame.f_globals['__file__']
+                # Skip frames from the csviper package itself
+                if 'csviper' not in file_path or file_path.endswith(('go.mysql.py', 'go.postgresql.py')):
+                    _CACHED_CALLER_SCRIPT_DIR = os.path.dirname(os.path.abspath(file_path))
+                    break
+            frame = frame.f_back
+    finally:
+        del frame
+    
+    return _CACHED_CALLER_SCRIPT_DIR
+
+
+# Database drivers, imported the first time an import for that database runs
+_psycopg2 = None
+_pymysql = None
+
+# Whether pymysql's LOAD DATA LOCAL sender was replaced with _install_load_local_sender's
+_LOAD_LOCAL_SENDER_INSTALLED = False
+
+
+def _get_psycopg2():
+    """
+    Import psycopg2 on first use so MySQL-only runs never load it.
+    
+    Returns:
+        module: The psycopg2 module
+        
+    Raises:
+        ImportExecutionError: If psycopg2 is not installed
+    """
+    global _psycopg2
+    if _psycopg2 is None:
+        try:
+            import psycopg2
+            import psycopg2.extras
+        except ImportError as e:
+            raise ImportExecutionError(
+                "psycopg2 library is required for PostgreSQL imports. Install with: pip install psycopg2-binary",
+                script_type="PostgreSQL",
+                original_error=e
+            )
+        _psycopg2 = psycopg2
+    return _psycopg2
+
+
+def _connect_postgresql(connect_kwargs):
+    """
+    Open a PostgreSQL connection whose commits don't wait for the WAL flush.
+    
+    Losing the last commits of an import in a server crash is acceptable because
+    the import and its post-import SQL can simply be re-run with --trample. The
+    setting is made with SET rather than a startup option, which connection
+    poolers such as PgBouncer reject.
+    
+    Args:
+        connect_kwargs (dict): Keyword arguments for psycopg2.connect
+        
+    Returns:
+        connection: psycopg2 connection
+    """
+    connection = _get_psycopg2().connect(**connect_kwargs)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SET synchronous_commit = off")
+        # Committed so a later rollback doesn't undo the setting
+        connection.commit()
+    except Exception:
+        connection.close()
+        raise
+    return connection
+
+
+def _get_pymysql():
+    """
+    Import pymysql on first use so PostgreSQL-only runs never load it.
+    
+    Returns:
+        module: The pymysql module
+        
+    Raises:
+        ImportExecutionError: If pymysql is not installed
+    """
+    global _pymysql
+    if _pymysql is None:
+        try:
+            import pymysql
+        except ImportError as e:
+            raise ImportExecutionError(
+                "pymysql library is required for MySQL imports. Install with: pip install pymysql",
+                script_type="MySQL",
+                original_error=e
+            )
+        _install_load_local_sender(pymysql)
+        _pymysql = pymysql
+    return _pymysql
+
+
+def _install_load_local_sender(pymysql):
+    """
+    Make pymysql send LOAD DATA LOCAL INFILE files in larger packets.
+    
+    pymysql streams the file in 16 KiB packets, one socket write each. The
+    server-side buffer variables can't be raised per session, so the client's
+    packet size is what limits upload throughput. The replacement sender also
+    decompresses gzipped CSV files while sending them.
+    
+    Args:
+        pymysql (module): The pymysql module
+    """
+    global _LOAD_LOCAL_SENDER_INSTALLED
+    connections = pymysql.connections
+    
+    def send_local_file(filename, conn):
+        packet_size = min(conn.max_allowed_packet, _LOAD_LOCAL_PACKET_SIZE)
+        # Parts registered by _load_mysql_chunks are sent as a byte range of their file
+        start, remaining = 0, None
+        if filename in _LOCAL_INFILE_PARTS:
+            filename, start, end = _LOCAL_INFILE_PARTS[filename]
+            remaining = end - start
+        try:
+            with _open_csv(filename, 'rb') as open_file:
+                if start:
+                    open_file.seek(start)
+                while True:
+                    chunk = open_file.read(packet_size if remaining is None else min(packet_size, remaining))
+                    if not chunk:
+                        break
+                    if remaining is not None:
+                        remaining -= len(chunk)
+                    conn.write_packet(chunk)
+        except OSError as e:
+            raise pymysql.err.OperationalError(
+                pymysql.constants.ER.FILE_NOT_FOUND,
+                f"Can't open file '{filename}': {e}"
+            )
+    
+    if hasattr(connections, '_send_local_file'):
+        # pymysql 1.1.1 and later; the caller sends the closing empty packet
+        connections._send_local_file = send_local_file
+        _LOAD_LOCAL_SENDER_INSTALLED = True
+    elif hasattr(getattr(connections, 'LoadLocalFile', None), 'send_data'):
+        class LargePacketLoadLocalFile(connections.LoadLocalFile):
+            def send_data(self):
+                if not self.connection._sock:
+                    raise pymysql.err.InterfaceError(0, "")
+                try:
+                    send_local_file(self.filename, self.connection)
+                finally:
+                    if not self.connection._closed:
+                        # An empty packet tells the server the file is done
+                        self.connection.write_packet(b"")
+        
+        connections.LoadLocalFile = LargePacketLoadLocalFile
+        _LOAD_LOCAL_SENDER_INSTALLED = True
+
+
+# Idle MySQL connections kept open between imports, keyed by (host, port, user, database).
+# Reused most-recently-returned first so the warmest connection is handed out.
+_MYSQL_POOL = {}
+_MYSQL_POOL_LOCK = threading.Lock()
+# Idle connections kept per key unless CSVIPER_MYSQL_POOL_MAX says otherwise
+_MYSQL_POOL_MAX_DEFAULT = 8
+
+
+# LOAD DATA LOCAL prefix, removed to have the server read the file itself
+_LOAD_DATA_LOCAL_RE = re.compile(r'^(\s*LOAD\s+DATA\s+)LOCAL\s+', re.IGNORECASE)
+
+# LOCAL implies IGNORE (duplicate keys and bad rows become warnings); the server-side
+# form needs it spelled out to behave the same
+_INTO_TABLE_RE = re.compile(r'\bINTO\s+TABLE\b', re.IGNORECASE)
+_DUPLICATE_HANDLING_RE = re.compile(r'\b(?:IGNORE|REPLACE)\s+INTO\s+TABLE\b', re.IGNORECASE)
+
+# Extra session settings for execute_mysql_import's perf_profile, as (set, restore)
+# clauses appended to the SET around LOAD DATA. Restoring puts pooled connections
+# back on the server defaults.
+_MYSQL_PERF_PROFILES = {
+    None: ("", ""),
+    'bulk': (
+        ", bulk_insert_buffer_size = 536870912, myisam_sort_buffer_size = 536870912, tmp_table_size = 268435456",
+        ", bulk_insert_buffer_size = DEFAULT, myisam_sort_buffer_size = DEFAULT, tmp_table_size = DEFAULT"
+    ),
+}
+
+# Errors meaning the server could not read the CSV file itself: file not found or
+# unreadable, missing FILE privilege, or a secure_file_priv restriction
+_SERVER_INFILE_ERRORS = frozenset((29, 1013, 1017, 1045, 1227, 1290))
+
+# secure_file_priv per (host, port, user, database), looked up once per process
+_MYSQL_SECURE_FILE_PRIV = {}
+
+
+def _server_side_load_sql(cursor, db_config, csv_full_path, import_data_sql):
+    """
+    Return the LOAD DATA statement without LOCAL if the server can read the CSV file itself.
+    
+    A server that shares this machine's filesystem can read the file straight
+    from disk, skipping the upload through the client connection. Only done when
+    CSVIPER_MYSQL_SERVER_INFILE=1, since whether the server sees the same path
+    (e.g. not inside a container) can't be told from here. It also needs an
+    uncompressed file, the FILE privilege, and a secure_file_priv setting that
+    allows the file's directory.
+    
+    Args:
+        cursor: pymysql cursor on the import connection
+        db_config (dict): Database configuration
+        csv_full_path (str): Absolute path of the CSV file
+        import_data_sql (str): LOAD DATA LOCAL INFILE statement
+        
+    Returns:
+        str: Server-side LOAD DATA statement, or None to keep the LOCAL upload
+    """
+    if os.environ.get('CSVIPER_MYSQL_SERVER_INFILE') != '1' or csv_full_path.endswith('.gz'):
+        return None
+    if not _LOAD_DATA_LOCAL_RE.match(import_data_sql):
+        return None
+    
+    key = _mysql_pool_key(db_config)
+    if key not in _MYSQL_SECURE_FILE_PRIV:
+        cursor.execute("SELECT @@GLOBAL.secure_file_priv")
+        _MYSQL_SECURE_FILE_PRIV[key] = cursor.fetchone()[0]
+    secure_file_priv = _MYSQL_SECURE_FILE_PRIV[key]
+    
+    # NULL disables server-side file reads; an empty value allows any directory
+    if secure_file_priv is None:
+        return None
+    if secure_file_priv:
+        allowed_dir = os.path.realpath(secure_file_priv)
+        if os.path.commonpath([allowed_dir, os.path.realpath(csv_full_path)]) != allowed_dir:
+            return None
+    
+    server_side_sql = _LOAD_DATA_LOCAL_RE.sub(r'\1', import_data_sql, count=1)
+    if not _DUPLICATE_HANDLING_RE.search(server_side_sql):
+        server_side_sql = _INTO_TABLE_RE.sub('IGNORE INTO TABLE', server_side_sql, count=1)
+    return server_side_sql
+
+
+# Byte ranges of CSV files being loaded in parallel, by the name used in their LOAD DATA statement
+_LOCAL_INFILE_PARTS = {}
+
+# Smallest part worth its own connection in a parallel load
+_MIN_LOAD_CHUNK_BYTES = 64 << 20
+
+_IGNORE_HEADER_RE = re.compile(r'\s*\bIGNORE\s+1\s+LINES\b', re.IGNORECASE)
+
+# A LOAD DATA statement with escaping turned off; MySQL's default escape is a backslash
+_NO_ESCAPE_RE = re.compile(r"\bESCAPED\s+BY\s+''(?!')", re.IGNORECASE)
+
+
+def _load_mysql_chunks(db_config, csv_full_path, import_data_template, db_schema_name, table_name, n_chunks, perf_profile, quote_char):
+    """
+    Load a CSV file with several concurrent LOAD DATA LOCAL statements, one per part of the file.
+    
+    The server runs each LOAD DATA on a single thread, so loading parts of the
+    file on separate pooled connections keeps several server threads busy.
+    Each part commits on its own; the target table must already be committed.
+    
+    Args:
+        db_config (dict): Database configuration
+        csv_full_path (str): Absolute path of the CSV file
+        import_data_template (str): LOAD DATA LOCAL INFILE statement with its placeholders
+        db_schema_name (str): Database schema name
+        table_name (str): Table name
+        n_chunks (int): Maximum number of parts
+        perf_profile (str): Session profile name from _MYSQL_PERF_PROFILES
+        quote_char (str): The CSV file's quote character, as in the statement's ENCLOSED BY
+        
+    Returns:
+        int: Total rows loaded
+    """
+    n_chunks = max(1, min(n_chunks, os.path.getsize(csv_full_path) // _MIN_LOAD_CHUNK_BYTES))
+    ranges = split_csv_ranges(csv_full_path, n_chunks, quote_char.encode())
+    set_sql, restore_sql = _MYSQL_PERF_PROFILES[perf_profile]
+    
+    # Each part is loaded under its own file name; only the first part starts with the header line
+    headerless_template = _IGNORE_HEADER_RE.sub('', import_data_template, count=1)
+    part_sqls = []
+    for i, (start, end) in enumerate(ranges):
+        part_name = f"{csv_full_path}.part{i}"
+        _LOCAL_INFILE_PARTS[part_name] = (csv_full_path, start, end)
+        part_sqls.append(ImportExecutor.replace_sql_placeholders(
+            import_data_template if i == 0 else headerless_template, db_schema_name, table_name, part_name
+        ))
+    
+    def load_part(part_sql):
+        with _pooled_mysql_connection(db_config) as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0" + set_sql)
+                cursor.execute(part_sql)
+                rows = cursor.rowcount
+                cursor.execute("SET SESSION unique_checks = 1, foreign_key_checks = 1" + restore_sql)
+            connection.commit()
+        return rows
+    
+    click.echo(f"Loading {len(ranges)} parts of the file concurrently")
+    try:
+        with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+            return sum(executor.map(load_part, part_sqls))
+    finally:
+        for i in range(len(ranges)):
+            _LOCAL_INFILE_PARTS.pop(f"{csv_full_path}.part{i}", None)
+
+
+def _quote_mysql_identifier(name):
+    """Quote a MySQL identifier with backticks, doubling any backticks inside it."""
+    return "`" + name.replace("`", "``") + "`"
+
+
+def _mysql_pool_key(db_config):
+    return (db_config['DB_HOST'], int(db_config['DB_PORT']), db_config['DB_USER'], db_config['DB_NAME'])
+
+
+def _mysql_pool_max():
+    """
+    Number of idle MySQL connections to keep per key.
+    
+    Returns:
+        int: CSVIPER_MYSQL_POOL_MAX, or the default if it is unset or not a number
+    """
+    try:
+        return int(os.environ.get('CSVIPER_MYSQL_POOL_MAX', _MYSQL_POOL_MAX_DEFAULT))
+    except ValueError:
+        return _MYSQL_POOL_MAX_DEFAULT
+
+
+def _get_mysql_connection(db_config):
+    """
+    Take an idle MySQL connection from the pool, or open a new one.
+    
+    Pooled connections are pinged first, which reconnects them if the server
+    dropped them while idle.
+    
+    Args:
+        db_config (dict): Database configuration
+        
+    Returns:
+        pymysql.connections.Connection: Open connection with LOCAL INFILE enabled
+    """
+    pymysql = _get_pymysql()
+    key = _mysql_pool_key(db_config)
+    
+    while True:
+        with _MYSQL_POOL_LOCK:
+            idle = _MYSQL_POOL.get(key)
+            connection = idle.pop() if idle else None
+        if connection is None:
+            break
+        try:
+            connection.ping(reconnect=True)
+            return connection
+        except pymysql.Error:
+            try:
+                connection.close()
+            except pymysql.Error:
+                pass
+    
+    return pymysql.connect(
+        host=db_config['DB_HOST'],
+        port=int(db_config['DB_PORT']),
+        user=db_config['DB_USER'],
+        password=db_config['DB_PASSWORD'],
+        database=db_config['DB_NAME'],
+        local_infile=True
+    )
+
+
+@contextlib.contextmanager
+def _pooled_mysql_connection(db_config):
+    """
+    Borrow a pooled MySQL connection for the duration of a with block.
+    
+    The connection goes back to the pool when the block finishes. If the block
+    raises, the connection is closed instead, since it may be mid-statement.
+    
+    Args:
+        db_config (dict): Database configuration
+        
+    Yields:
+        pymysql.connections.Connection: Open connection
+        
+    Raises:
+        DatabaseConnectionError: If no connection could be opened
+    """
+    pymysql = _get_pymysql()
+    try:
+        connection = _get_mysql_connection(db_config)
+    except (pymysql.Error, OSError, ValueError) as e:
+        connection_details = {
+            'host': db_config['DB_HOST'],
+            'port': db_config['DB_PORT'],
+            'user': db_config['DB_USER'],
+            'database': db_config['DB_NAME']
+        }
+        raise DatabaseConnectionError(
+            f"Failed to connect to MySQL database: {str(e)}",
+            db_type="MySQL",
+            connection_details=connection_details
+        )
+    
+    try:
+        yield connection
+    except BaseException:
+        connection.close()
+        raise
+    if connection.open:
+        _return_mysql_connection(db_config, connection)
+
+
+def _return_mysql_connection(db_config, connection):
+    """
+    Put a MySQL connection back in the pool, closing it if the pool is full.
+    
+    Args:
+        db_config (dict): Database configuration the connection was opened with
+        connection (pymysql.connections.Connection): Connection to return
+    """
+    pymysql = _get_pymysql()
+    try:
+        connection.rollback()
+    except pymysql.Error:
+        connection.close()
+        return
+    
+    with _MYSQL_POOL_LOCK:
+        idle = _MYSQL_POOL.setdefault(_mysql_pool_key(db_config), deque())
+        if len(idle) < _mysql_pool_max():
+            idle.append(connection)
+            return
+    connection.close()
+
+
+def close_mysql_pool():
+    """Close every idle pooled MySQL connection."""
+    with _MYSQL_POOL_LOCK:
+        connections = [connection for idle in _MYSQL_POOL.values() for connection in idle]
+        _MYSQL_POOL.clear()
+    for connection in connections:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+# Pooled connections outlive the imports that opened them; close them before the interpreter exits
+atexit.register(close_mysql_pool)
+
+
+def invalidate_caller_cache():
+    """Forget the cached caller script directory and post-import SQL file lists."""
+    global _CACHED_CALLER_SCRIPT_DIR
+    _CACHED_CALLER_SCRIPT_DIR = None
+    _scan_post_import_sql_files.cache_clear()
+
+
+class _LimitedLineReader:
+    """
+    Read-only file-like object over the header and the first few lines of a file.
+    
+    Lines are pulled from the underlying file only as read() needs them, so a
+    limited test import never holds more than about one read's worth of data.
+    """
+    
+    def __init__(self, file_obj, limit):
+        self._lines = chain([file_obj.readline()], islice(file_obj, limit))
+        self._pending = ''
+    
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data = self._pending + ''.join(self._lines)
+            self._pending = ''
+            return data
+        
+        parts = [self._pending]
+        available = len(self._pending)
+        while available < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            available += len(line)
+        
+        data = ''.join(parts)
+        self._pending = data[size:]
+        return data[:size]
+
+
+class _ReadAheadReader:
+    """
+    Read-only file-like object that reads the next chunks of a file in a background thread.
+    
+    psycopg2 releases the GIL while it sends COPY data, so reading the next
+    chunks from disk overlaps with sending the current one instead of the two
+    alternating. Up to _READ_AHEAD_CHUNKS chunks are buffered.
+    """
+    
+    def __init__(self, file_obj, chunk_size=_COPY_CHUNK_SIZE):
+        self.file_obj = file_obj
+        self.name = file_obj.name
+        self.mode = file_obj.mode
+        self.encoding = file_obj.encoding
+        self.fileno = file_obj.fileno
+        self._chunk_size = chunk_size
+        self._chunks = queue.Queue(maxsize=_READ_AHEAD_CHUNKS)
+        self._stop = threading.Event()
+        self._pending = ''
+        self._eof = False
+        self._thread = threading.Thread(target=self._fill, name='csviper-read-ahead', daemon=True)
+        self._thread.start()
+    
+    @property
+    def closed(self):
+        return self.file_obj.closed
+    
+    def _fill(self):
+        try:
+            while not self._stop.is_set():
+                chunk = self.file_obj.read(self._chunk_size)
+                self._put(chunk)
+                if not chunk:
+                    return
+        except Exception as e:
+            self._put(e)
+    
+    def _put(self, item):
+        # Give up if the consumer has stopped reading, rather than block forever
+        while not self._stop.is_set():
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+    
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = float('inf')
+        
+        parts = [self._pending]
+        available = len(self._pending)
+        while available < size and not self._eof:
+            chunk = self._chunks.get()
+            if isinstance(chunk, Exception):
+                self._eof = True
+                raise chunk
+            if not chunk:
+                self._eof = True
+                break
+            parts.append(chunk)
+            available += len(chunk)
+        
+        data = ''.join(parts)
+        if available <= size:
+            self._pending = ''
+            return data
+        self._pending = data[size:]
+        return data[:size]
+    
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.file_obj.close()
 
 
 class Colors:
@@ -38,6 +855,9 @@ class ImportExecutor:
         """
         Find and return post-import SQL files in execution order.
         
+        The directory is scanned once per process; call invalidate_caller_cache()
+        to pick up files added afterwards.
+        
         Args:
             script_dir (str): Directory containing the script
             db_type (str): Database type ('mysql' or 'postgresql')
@@ -45,61 +865,40 @@ class ImportExecutor:
         Returns:
             List[Tuple[int, str]]: List of (order, filepath) tuples sorted by order
         """
-        import glob
-        
-        post_import_dir = os.path.join(script_dir, 'post_import_sql')
-        if not os.path.exists(post_import_dir):
-            return []
-        
-        files_with_order = []
-        
-        # Look for SQL files in subdirectories
-        for root, dirs, files in os.walk(post_import_dir):
-            for filename in files:
-                # First, look for database-specific files
-                if filename.endswith(f'.{db_type}.sql'):
-                    # Extract numeric prefix
-                    try:
-                        order_str = filename.split('_')[0]
-                        order = int(order_str)
-                        filepath = os.path.join(root, filename)
-                        files_with_order.append((order, filepath))
-                    except (ValueError, IndexError):
-                        # Skip files that don't follow the naming convention
-                        continue
-        
-        # If no database-specific files found, look for generic .sql files
-        if not files_with_order:
-            other_db_type = 'postgresql' if db_type == 'mysql' else 'mysql'
-            for root, dirs, files in os.walk(post_import_dir):
-                for filename in files:
-                    if filename.endswith('.sql') and not filename.endswith(f'.{other_db_type}.sql'):
-                        # Extract numeric prefix
-                        try:
-                            order_str = filename.split('_')[0]
-                            order = int(order_str)
-                            filepath = os.path.join(root, filename)
-                            files_with_order.append((order, filepath))
-                        except (ValueError, IndexError):
-                            # Skip files that don't follow the naming convention
-                            continue
-        
-        # Sort by order
-        files_with_order.sort(key=lambda x: x[0])
-        
-        return files_with_order
+        return list(_scan_post_import_sql_files(script_dir, db_type))
 
     @staticmethod
-    def execute_post_import_sql(connection, post_import_files, db_schema_name, table_name, use_colors=True):
+    def execute_post_import_sql(connection, post_import_files, db_schema_name, table_name, use_colors=True,
+                                batch_statements=False, connect=None, dialect='postgresql'):
         """
         Execute post-import SQL files in order.
         
+        Each file is committed once, after all of its statements have run. With
+        batch_statements, a file's statements are sent to the server in a single
+        round trip inside a savepoint; if any of them fails the batch is rolled
+        back and the statements are retried one at a time so the failing ones can
+        be reported and skipped. Only use batching on connections with
+        transactional DDL (PostgreSQL).
+        
+        Files sharing the same order number are independent of each other. When
+        a connect callable is given, each file in such a group runs on its own
+        connection in a worker thread, so e.g. several CREATE INDEX files build
+        at the same time. A file whose extra connection can't be opened (e.g. the
+        server's connection limit is reached) runs on the given connection once
+        the rest of its group has finished. Groups with different order numbers
+        still run one after another.
+        
         Args:
             connection: Database connection
             post_import_files (List[Tuple[int, str]]): List of (order, filepath) tuples
             db_schema_name (str): Database schema name
             table_name (str): Table name
             use_colors (bool): Whether to use colored output for errors
+            batch_statements (bool): Whether to send each file's statements as one batch
+            connect (callable, optional): Opens a new connection to the same database,
+                used to run same-order files in parallel
+            dialect (str): 'mysql' or 'postgresql', the SQL dialect the files are split in.
+                Defaults to 'postgresql'.
         """
         if not post_import_files:
             click.echo("No post-import SQL files found")
@@ -107,40 +906,112 @@ class ImportExecutor:
         
         click.echo(f"Executing {len(post_import_files)} post-import SQL files...")
         
+        replacements = {'DATABASE_NAME': db_schema_name, 'TABLE_NAME': table_name}
+        
+        def substitute(match):
+            return replacements[match.group(1)]
+        
+        def run_on_new_connection(filepath):
+            # Returns the file path if it still has to run on the main connection
+            try:
+                worker_connection = connect()
+            except Exception as e:
+                click.echo(f"Could not open another connection for {os.path.basename(filepath)} ({e}); "
+                           f"running it on the main connection")
+                return filepath
+            try:
+                ImportExecutor._execute_post_import_file(
+                    worker_connection, filepath, substitute, use_colors, batch_statements, dialect
+                )
+            finally:
+                worker_connection.close()
+            return None
+        
+        for order, group in groupby(post_import_files, key=itemgetter(0)):
+            filepaths = [filepath for _, filepath in group]
+            
+            if connect is None or len(filepaths) == 1:
+                for filepath in filepaths:
+                    ImportExecutor._execute_post_import_file(
+                        connection, filepath, substitute, use_colors, batch_statements, dialect
+                    )
+                continue
+            
+            click.echo(f"Running {len(filepaths)} post-import SQL files with order {order} in parallel")
+            workers = min(len(filepaths), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                deferred = [filepath for filepath in executor.map(run_on_new_connection, filepaths)
+                            if filepath is not None]
+            for filepath in deferred:
+                ImportExecutor._execute_post_import_file(
+                    connection, filepath, substitute, use_colors, batch_statements, dialect
+                )
+        
+        click.echo("✓ Post-import SQL execution completed")
+
+    @staticmethod
+    def _execute_post_import_file(connection, filepath, substitute, use_colors, batch_statements, dialect):
+        """
+        Execute one post-import SQL file and commit it.
+        
+        Args:
+            connection: Database connection
+            filepath (str): Path to the SQL file
+            substitute (callable): Replacement function for placeholder matches
+            use_colors (bool): Whether to use colored output for errors
+            batch_statements (bool): Whether to send the file's statements as one batch
+            dialect (str): 'mysql' or 'postgresql', the SQL dialect of the file
+        """
+        # Error message formatter, chosen once instead of at every error
+        color = Colors.dark_red if use_colors else str
+        
+        filename = os.path.basename(filepath)
+        click.echo(f"Executing post-import SQL: {filename}")
+        
+        # Read SQL file
+        with open(filepath, 'r', encoding='utf-8') as f:
+            sql_content = f.read()
+        
+        # Replace placeholders
+        sql_content = _POST_IMPORT_PLACEHOLDER_RE.sub(substitute, sql_content)
+        
+        # Split into individual statements, skipping comment-only ones
+        statements = list(_split_sql_statements(sql_content, dialect))
+        
         with connection.cursor() as cursor:
-            for order, filepath in post_import_files:
-                filename = os.path.basename(filepath)
-                click.echo(f"Executing post-import SQL: {filename}")
-                
-                # Read SQL file
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    sql_content = f.read()
-                
-                # Replace placeholders
-                sql_content = sql_content.replace('REPLACE_ME_DATABASE_NAME', db_schema_name) \
-                                       .replace('REPLACE_ME_TABLE_NAME', table_name)
-                
-                # Split into individual statements and execute
-                statements = [stmt.strip() for stmt in sql_content.split(';') if stmt.strip()]
+            if batch_statements and len(statements) > 1:
                 for statement in statements:
-                    if statement and not statement.startswith('--'):
-                        try:
-                            click.echo(f"  Executing: {statement}")
-                            cursor.execute(statement)
-                            connection.commit()
-                        except Exception as e:
-                            error_msg = f"Warning: Error executing statement in {filename}: {e}"
-                            statement_msg = f"  Failed statement: {statement}"
-                            if use_colors:
-                                click.echo(Colors.dark_red(error_msg))
-                                click.echo(Colors.dark_red(statement_msg))
-                            else:
-                                click.echo(error_msg)
-                                click.echo(statement_msg)
-                            # Continue with next statement
-                            continue
+                    click.echo(f"  Executing: {statement}")
+                try:
+                    cursor.execute("SAVEPOINT csviper_post_import")
+                    cursor.execute(";\n".join(statements))
+                    cursor.execute("RELEASE SAVEPOINT csviper_post_import")
+                    connection.commit()
+                    return
+                except Exception:
+                    _rollback_post_import_savepoint(connection, cursor)
+                    click.echo(f"  Batch failed for {filename}, retrying statements one at a time")
+            
+            for statement in statements:
+                try:
+                    if batch_statements:
+                        # Keep one failed statement from aborting the whole transaction
+                        cursor.execute("SAVEPOINT csviper_post_import")
+                    click.echo(f"  Executing: {statement}")
+                    cursor.execute(statement)
+                    if batch_statements:
+                        cursor.execute("RELEASE SAVEPOINT csviper_post_import")
+                except Exception as e:
+                    if batch_statements:
+                        _rollback_post_import_savepoint(connection, cursor)
+                    error_msg = f"Warning: Error executing statement in {filename}: {e}"
+                    statement_msg = f"  Failed statement: {statement}"
+                    click.echo(color(error_msg))
+                    click.echo(color(statement_msg))
+                    # Continue with next statement
+                    continue
         
-        click.echo("✓ Post-import SQL execution completed")
+        connection.commit()
 
     @staticmethod
     def find_env_file():
@@ -157,22 +1028,8 @@ class ImportExecutor:
         if os.path.exists(current_dir_env):
             return current_dir_env
         
-        # Get the directory of the calling script by walking up the stack
-        # to find the first frame that's not in the csviper package
-        import inspect
-        frame = inspect.currentframe()
-        script_dir = None
-        try:
-            while frame:
-                frame = frame.f_back
-                if frame and '__file__' in frame.f_globals:
-                    file_path = frame.f_globals['__file__']
-                    # Skip frames from the csviper package itself
-                    if 'csviper' not in file_path or file_path.endswith(('go.mysql.py', 'go.postgresql.py')):
-                        script_dir = os.path.dirname(os.path.abspath(file_path))
-                        break
-        finally:
-            del frame
+        # Directory of the generated script that called into csviper
+        script_dir = _caller_script_dir()
         
         # Check script directory
         if script_dir:
@@ -200,55 +1057,26 @@ class ImportExecutor:
         in the current working directory first (project root).
         Warns if .env is not properly excluded.
         """
-        # Check current working directory (project root when invoked from parent)
-        gitignore_path = os.path.join(os.getcwd(), '.gitignore')
-        if os.path.exists(gitignore_path):
-            with open(gitignore_path, 'r') as f:
-                gitignore_content = f.read()
-                if '.env' not in gitignore_content:
-                    click.echo("Warning: .env file should be added to .gitignore to avoid committing credentials")
-            return
-        
-        # Get the directory of the calling script by walking up the stack
-        # to find the first frame that's not in the csviper package
-        import inspect
-        frame = inspect.currentframe()
-        script_dir = None
-        try:
-            while frame:
-                frame = frame.f_back
-                if frame and '__file__' in frame.f_globals:
-                    file_path = frame.f_globals['__file__']
-                    # Skip frames from the csviper package itself
-                    if 'csviper' not in file_path or file_path.endswith(('go.mysql.py', 'go.postgresql.py')):
-                        script_dir = os.path.dirname(os.path.abspath(file_path))
-                        break
-        finally:
-            del frame
-        
-        # Check script directory
+        # Check current working directory (project root when invoked from parent),
+        # then the calling script's directory and its parent
+        candidate_dirs = [os.getcwd()]
+        script_dir = _caller_script_dir()
         if script_dir:
-            script_gitignore_path = os.path.join(script_dir, '.gitignore')
-            if os.path.exists(script_gitignore_path):
-                with open(script_gitignore_path, 'r') as f:
-                    gitignore_content = f.read()
-                    if '.env' not in gitignore_content:
-                        click.echo("Warning: .env file should be added to .gitignore to avoid committing credentials")
-                return
-            
-            # Check parent of script directory
-            parent_gitignore_path = os.path.join(os.path.dirname(script_dir), '.gitignore')
-            if os.path.exists(parent_gitignore_path):
-                with open(parent_gitignore_path, 'r') as f:
-                    gitignore_content = f.read()
-                    if '.env' not in gitignore_content:
+            candidate_dirs += [script_dir, os.path.dirname(script_dir)]
+        
+        for candidate_dir in candidate_dirs:
+            gitignore_path = os.path.join(candidate_dir, '.gitignore')
+            if os.path.exists(gitignore_path):
+                # The check is ASCII, so there is no need to decode the file
+                with open(gitignore_path, 'rb') as f:
+                    if b'.env' not in f.read():
                         click.echo("Warning: .env file should be added to .gitignore to avoid committing credentials")
                 return
         
         click.echo("Warning: No .gitignore file found. Consider creating one and adding .env to it")
 
     @staticmethod
-    def validate_csv_header(csv_file, expected_columns, encoding='utf-8', use_colors=True):
+    def validate_csv_header(csv_file, expected_columns, encoding='utf-8', use_colors=True, delimiter=','):
         """
         Validate that CSV header matches expected columns from metadata.
         
@@ -257,28 +1085,36 @@ class ImportExecutor:
             expected_columns (list): Expected column names from metadata
             encoding (str): File encoding to use for reading CSV
             use_colors (bool): Whether to use colored output for errors
+            delimiter (str): Field delimiter of the CSV file
             
         Raises:
             ValueError: If headers don't match
         """
-        with open(csv_file, 'r', newline='', encoding=encoding) as f:
-            reader = csv.reader(f)
-            actual_header = next(reader)
+        # Error message formatter, chosen once instead of at every error
+        color = Colors.dark_red if use_colors else str
+        
+        with _open_csv(csv_file, 'r', newline='', encoding=encoding) as f:
+            first_line = f.readline()
+            if '"' in first_line:
+                # Quoted fields may hide delimiters or newlines; let csv parse them,
+                # continuing from the line already read instead of re-reading the file
+                actual_header = next(csv.reader(chain([first_line], f), delimiter=delimiter))
+            else:
+                # Unquoted header: a plain split gives the same fields as csv.reader
+                actual_header = first_line.rstrip('\r\n').split(delimiter)
+        
+        # Matching headers are the common case; only look for the difference on a mismatch
+        if actual_header == list(expected_columns):
+            return
         
         if len(actual_header) != len(expected_columns):
             error_msg = f"Column count mismatch: Expected {len(expected_columns)}, got {len(actual_header)}"
-            if use_colors:
-                raise ValueError(Colors.dark_red(error_msg))
-            else:
-                raise ValueError(error_msg)
+            raise ValueError(color(error_msg))
         
         for i, (expected, actual) in enumerate(zip(expected_columns, actual_header)):
             if expected != actual:
                 error_msg = f"Column {i+1} mismatch: Expected '{expected}', got '{actual}'"
-                if use_colors:
-                    raise ValueError(Colors.dark_red(error_msg))
-                else:
-                    raise ValueError(error_msg)
+                raise ValueError(color(error_msg))
 
     @staticmethod
     def load_sql_file(filename, script_dir=None, use_colors=True):
@@ -293,34 +1129,20 @@ class ImportExecutor:
         Returns:
             str: SQL content
         """
+        # Error message formatter, chosen once instead of at every error
+        color = Colors.dark_red if use_colors else str
+        
         if script_dir is None:
-            # Get the directory of the calling script by walking up the stack
-            # to find the first frame that's not in the csviper package
-            import inspect
-            frame = inspect.currentframe()
-            try:
-                while frame:
-                    frame = frame.f_back
-                    if frame and '__file__' in frame.f_globals:
-                        file_path = frame.f_globals['__file__']
-                        # Skip frames from the csviper package itself
-                        if 'csviper' not in file_path or file_path.endswith(('go.mysql.py', 'go.postgresql.py')):
-                            script_dir = os.path.dirname(os.path.abspath(file_path))
-                            break
-            finally:
-                del frame
+            # Directory of the generated script that called into csviper
+            script_dir = _caller_script_dir()
         
         sql_path = os.path.join(script_dir, filename)
         
         if not os.path.exists(sql_path):
             error_msg = f"SQL file not found: {sql_path}"
-            if use_colors:
-                raise FileNotFoundError(Colors.dark_red(error_msg))
-            else:
-                raise FileNotFoundError(error_msg)
+            raise FileNotFoundError(color(error_msg))
         
-        with open(sql_path, 'r') as f:
-            return f.read()
+        return _read_sql_file(sql_path)
 
     @staticmethod
     def replace_sql_placeholders(sql_content, db_name, table_name, csv_path):
@@ -336,10 +1158,22 @@ class ImportExecutor:
         Returns:
             str: SQL content with placeholders replaced
         """
-        return sql_content.replace('REPLACE_ME_DB_NAME', db_name) \
-                         .replace('REPLACE_ME_TABLE_NAME', table_name) \
-                         .replace('REPLACE_ME_CSV_FULL_PATH', csv_path)
+        replacements = {'DB_NAME': db_name, 'TABLE_NAME': table_name, 'CSV_FULL_PATH': csv_path}
+        return _SQL_PLACEHOLDER_RE.sub(lambda m: replacements[m.group(1)], sql_content)
 
+    @staticmethod
+    def resolve_csv_path(csv_file):
+        """
+        Expand ~ in a CSV file path and make it absolute.
+        
+        Args:
+            csv_file (str): Path to CSV file, as given on the command line
+            
+        Returns:
+            str: Absolute path of the CSV file
+        """
+        return os.path.abspath(os.path.expanduser(csv_file))
+    
     @staticmethod
     def load_and_validate_config(env_file_location, csv_file, db_schema_name, table_name, metadata_filename, use_colors=True):
         """
@@ -356,35 +1190,29 @@ class ImportExecutor:
         Returns:
             tuple: (db_config, db_schema_name, table_name, metadata, encoding)
         """
+        # Error message formatter, chosen once instead of at every error
+        color = Colors.dark_red if use_colors else str
+        
         # Expand user path (handle ~ symbol)
-        csv_file = os.path.expanduser(csv_file)
+        csv_file = ImportExecutor.resolve_csv_path(csv_file)
         
         # Validate CSV file exists
         if not os.path.exists(csv_file):
             error_msg = f"CSV file not found: {csv_file}"
-            if use_colors:
-                raise FileNotFoundError(Colors.dark_red(error_msg))
-            else:
-                raise FileNotFoundError(error_msg)
+            raise FileNotFoundError(color(error_msg))
         
         # Find .env file
         if env_file_location:
             env_file_location = os.path.expanduser(env_file_location)
             if not os.path.exists(env_file_location):
                 error_msg = f".env file not found: {env_file_location}"
-                if use_colors:
-                    raise FileNotFoundError(Colors.dark_red(error_msg))
-                else:
-                    raise FileNotFoundError(error_msg)
+                raise FileNotFoundError(color(error_msg))
             env_file = env_file_location
         else:
             env_file = ImportExecutor.find_env_file()
             if not env_file:
                 error_msg = "No .env file found. Specify --env_file_location or place .env in current/parent directory"
-                if use_colors:
-                    raise FileNotFoundError(Colors.dark_red(error_msg))
-                else:
-                    raise FileNotFoundError(error_msg)
+                raise FileNotFoundError(color(error_msg))
         
         # Check .gitignore
         ImportExecutor.check_gitignore_for_env()
@@ -401,10 +1229,7 @@ class ImportExecutor:
             value = os.getenv(var)
             if not value:
                 error_msg = f"Required environment variable not found: {var}"
-                if use_colors:
-                    raise ValueError(Colors.dark_red(error_msg))
-                else:
-                    raise ValueError(error_msg)
+                raise ValueError(color(error_msg))
             db_config[var] = value
         
         for var in optional_vars:
@@ -412,47 +1237,30 @@ class ImportExecutor:
             if value:
                 db_config[var] = value
         
-        # Load metadata to validate CSV header
-        # Get the directory of the calling script by walking up the stack
-        # to find the first frame that's not in the csviper package
-        import inspect
-        frame = inspect.currentframe()
-        script_dir = None
-        try:
-            while frame:
-                frame = frame.f_back
-                if frame and '__file__' in frame.f_globals:
-                    file_path = frame.f_globals['__file__']
-                    # Skip frames from the csviper package itself
-                    if 'csviper' not in file_path or file_path.endswith(('go.mysql.py', 'go.postgresql.py')):
-                        script_dir = os.path.dirname(os.path.abspath(file_path))
-                        break
-        finally:
-            del frame
+        # Load metadata (from the calling script's directory) to validate CSV header
+        script_dir = _caller_script_dir()
         
         metadata_file = os.path.join(script_dir, metadata_filename)
         
-        with open(metadata_file, 'r') as f:
-            metadata = json.load(f)
+        if orjson is not None:
+            with open(metadata_file, 'rb') as f:
+                metadata = orjson.loads(f.read())
+        else:
+            with open(metadata_file, 'r') as f:
+                metadata = json.load(f)
         
         # Determine schema and table names
         if not db_schema_name:
             db_schema_name = db_config.get('DB_SCHEMA')
             if not db_schema_name:
                 error_msg = "Database schema name must be provided via --db_schema_name or DB_SCHEMA environment variable"
-                if use_colors:
-                    raise ValueError(Colors.dark_red(error_msg))
-                else:
-                    raise ValueError(error_msg)
+                raise ValueError(color(error_msg))
         
         if not table_name:
             table_name = db_config.get('DB_TABLE')
             if not table_name:
                 error_msg = "Table name must be provided via --table_name or DB_TABLE environment variable"
-                if use_colors:
-                    raise ValueError(Colors.dark_red(error_msg))
-                else:
-                    raise ValueError(error_msg)
+                raise ValueError(color(error_msg))
         
         # Get encoding from metadata, with fallback to utf-8
         encoding = metadata.get('encoding', 'utf-8')
@@ -468,7 +1276,7 @@ class ImportExecutor:
         return db_config, db_schema_name, table_name, metadata, encoding
 
     @staticmethod
-    def execute_postgresql_import(*, db_config, db_schema_name, table_name, csv_file, trample, create_table_sql_file, encoding='utf-8', import_only_lines=None):
+    def execute_postgresql_import(*, db_config, db_schema_name, table_name, csv_file, trample, create_table_sql_file, encoding='utf-8', import_only_lines=None, post_import_files=None, caller_script_dir=None):
         """
         Execute PostgreSQL import process.
         
@@ -481,20 +1289,15 @@ class ImportExecutor:
             create_table_sql_file (str): Name of the CREATE TABLE SQL file
             encoding (str): File encoding to use for reading CSV
             import_only_lines (int, optional): Number of lines to import for testing. Defaults to None (all lines).
+            post_import_files (List[Tuple[int, str]], optional): Pre-resolved (order, filepath) post-import
+                SQL files. Defaults to None, which discovers them next to the calling script.
+            caller_script_dir (str, optional): Directory of the generated import script, holding its SQL
+                files. Defaults to None, which finds it by walking the call stack.
         """
-        try:
-            import psycopg2
-            import psycopg2.extras
-        except ImportError as e:
-            from .exceptions import ImportExecutionError
-            raise ImportExecutionError(
-                "psycopg2 library is required for PostgreSQL imports. Install with: pip install psycopg2-binary",
-                script_type="PostgreSQL",
-                original_error=e
-            )
+        psycopg2 = _get_psycopg2()
         
         # Load SQL files
-        create_table_sql = ImportExecutor.load_sql_file(create_table_sql_file)
+        create_table_sql = ImportExecutor.load_sql_file(create_table_sql_file, caller_script_dir)
         
         # Replace placeholders
         csv_full_path = os.path.abspath(csv_file)
@@ -502,15 +1305,15 @@ class ImportExecutor:
         
         # Connect to database
         try:
-            connection = psycopg2.connect(
-                host=db_config['DB_HOST'],
-                port=int(db_config['DB_PORT']),
-                user=db_config['DB_USER'],
-                password=db_config['DB_PASSWORD'],
-                database=db_config['DB_NAME']
-            )
+            connect_kwargs = {
+                'host': db_config['DB_HOST'],
+                'port': int(db_config['DB_PORT']),
+                'user': db_config['DB_USER'],
+                'password': db_config['DB_PASSWORD'],
+                'database': db_config['DB_NAME']
+            }
+            connection = _connect_postgresql(connect_kwargs)
         except psycopg2.Error as e:
-            from .exceptions import DatabaseConnectionError
             connection_details = {
                 'host': db_config['DB_HOST'],
                 'port': db_config['DB_PORT'],
@@ -523,7 +1326,6 @@ class ImportExecutor:
                 connection_details=connection_details
             )
         except Exception as e:
-            from .exceptions import DatabaseConnectionError
             raise DatabaseConnectionError(
                 f"Unexpected error connecting to PostgreSQL database: {str(e)}",
                 db_type="PostgreSQL"
@@ -546,39 +1348,28 @@ class ImportExecutor:
                 # Create schema if it doesn't exist
                 cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {db_schema_name}")
                 
-                # Execute CREATE TABLE statements
-                statements = [stmt.strip() for stmt in create_table_sql.split(';') if stmt.strip()]
-                for statement in statements:
-                    if statement:
-                        click.echo(f"Executing: {statement}...")
-                        cursor.execute(statement)
+                # Execute CREATE TABLE statements, sent to the server in one round trip
+                statements = list(_split_sql_statements(create_table_sql, 'postgresql'))
+                if statements:
+                    # One write for the whole progress listing rather than one per statement
+                    click.echo("\n".join(f"Executing: {statement}..." for statement in statements))
+                    cursor.execute(";\n".join(statements))
                 
                 # Import data using COPY FROM STDIN with progress bar
                 click.echo("Importing data...")
                 
-                # Build the COPY command
-                copy_sql = f"COPY {db_schema_name}.{table_name} FROM STDIN WITH CSV HEADER"
+                # Build the COPY command. The table was created earlier in this same
+                # transaction (psycopg2 does not autocommit), which lets FREEZE write
+                # the rows already frozen and skip most of the WAL for them.
+                copy_sql = f"COPY {db_schema_name}.{table_name} FROM STDIN WITH (FORMAT CSV, HEADER, FREEZE)"
 
                 if import_only_lines and int(import_only_lines) > 0:
                     limit = int(import_only_lines)
                     click.echo(f"Limiting import to {limit} lines for testing.")
                     
-                    # Create an in-memory text buffer
-                    buffer = io.StringIO()
-                    
+                    # Stream the header and the first `limit` lines straight into COPY
                     with open(csv_file, 'r', encoding=encoding) as f:
-                        # Write header
-                        header = f.readline()
-                        buffer.write(header)
-                        
-                        # Write limited number of lines
-                        for i, line in enumerate(f):
-                            if i >= limit:
-                                break
-                            buffer.write(line)
-                    
-                    buffer.seek(0)  # Rewind buffer to the beginning
-                    cursor.copy_expert(copy_sql, buffer)
+                        cursor.copy_expert(copy_sql, _LimitedLineReader(f, limit), size=_COPY_CHUNK_SIZE)
 
                 else:
                     # Get file size for progress tracking
@@ -590,73 +1381,86 @@ class ImportExecutor:
                             self.file_obj = file_obj
                             self.file_size = file_size
                             self.bytes_read = 0
+                            # Plain attributes that psycopg2 may look at, bound once
+                            # instead of forwarded through __getattr__ on every access
+                            self.name = file_obj.name
+                            self.mode = file_obj.mode
+                            self.encoding = file_obj.encoding
+                            self.fileno = file_obj.fileno
+                            # Progress not yet drawn; redrawing the bar on every
+                            # read costs terminal writes, so updates are batched
+                            self._pending = 0
+                            self._last_update = time.monotonic()
                             self.progress_bar = click.progressbar(length=file_size, 
                                                                 label='Uploading CSV data',
                                                                 show_percent=True,
                                                                 show_eta=True)
                             self.progress_bar.__enter__()
                         
+                        @property
+                        def closed(self):
+                            return self.file_obj.closed
+                        
                         def read(self, size=-1):
+                            # COPY keeps reading until EOF, so cap each read at one chunk
+                            if size < 0 or size > _COPY_CHUNK_SIZE:
+                                size = _COPY_CHUNK_SIZE
                             data = self.file_obj.read(size)
                             if data:
-                                self.bytes_read += len(data)
-                                self.progress_bar.update(len(data))
+                                self._advance(len(data))
                             return data
                         
-                        def readline(self):
-                            line = self.file_obj.readline()
-                            if line:
-                                self.bytes_read += len(line)
-                                self.progress_bar.update(len(line))
-                            return line
-                        
-                        def __getattr__(self, name):
-                            return getattr(self.file_obj, name)
+                        def _advance(self, amount):
+                            self.bytes_read += amount
+                            self._pending += amount
+                            now = time.monotonic()
+                            if (self._pending >= _PROGRESS_UPDATE_BYTES
+                                    or now - self._last_update >= _PROGRESS_UPDATE_SECONDS):
+                                self.progress_bar.update(self._pending)
+                                self._pending = 0
+                                self._last_update = now
                         
                         def close(self):
+                            if self._pending:
+                                self.progress_bar.update(self._pending)
+                                self._pending = 0
                             self.progress_bar.__exit__(None, None, None)
                             self.file_obj.close()
                     
                     with open(csv_file, 'r', encoding=encoding) as f:
-                        progress_wrapper = ProgressFileWrapper(f, file_size)
+                        progress_wrapper = ProgressFileWrapper(_ReadAheadReader(f), file_size)
                         try:
-                            cursor.copy_expert(copy_sql, progress_wrapper)
+                            cursor.copy_expert(copy_sql, progress_wrapper, size=_COPY_CHUNK_SIZE)
                         finally:
                             progress_wrapper.close()
                 
-                # Get row count
-                cursor.execute(f"SELECT COUNT(*) FROM {db_schema_name}.{table_name}")
-                row_count = cursor.fetchone()[0]
-                click.echo(f"✓ Successfully imported {row_count:,} rows")
+                # Row count reported by the COPY command tag; counting the rows
+                # with a query would scan the whole freshly loaded table
+                row_count = cursor.rowcount
+                if row_count is not None and row_count >= 0:
+                    click.echo(f"✓ Successfully imported {row_count:,} rows")
+                else:
+                    click.echo("✓ Successfully imported rows (row count unavailable)")
             
             connection.commit()
             
             # Execute post-import SQL files
-            # Get the directory of the calling script by walking up the stack
-            # to find the first frame that's not in the csviper package
-            import inspect
-            frame = inspect.currentframe()
-            script_dir = None
-            try:
-                while frame:
-                    frame = frame.f_back
-                    if frame and '__file__' in frame.f_globals:
-                        file_path = frame.f_globals['__file__']
-                        # Skip frames from the csviper package itself
-                        if 'csviper' not in file_path or file_path.endswith(('go.mysql.py', 'go.postgresql.py')):
-                            script_dir = os.path.dirname(os.path.abspath(file_path))
-                            break
-            finally:
-                del frame
+            # Callers that already know the file list can pass it and skip discovery
+            if post_import_files is None:
+                # Directory of the generated script that called into csviper
+                script_dir = caller_script_dir or _caller_script_dir()
             
-            post_import_files = ImportExecutor.find_post_import_sql_files(script_dir, 'postgresql')
-            ImportExecutor.execute_post_import_sql(connection, post_import_files, db_schema_name, table_name)
+                post_import_files = ImportExecutor.find_post_import_sql_files(script_dir, 'postgresql')
+            ImportExecutor.execute_post_import_sql(connection, post_import_files, db_schema_name, table_name,
+                                                   batch_statements=True,
+                                                   connect=lambda: _connect_postgresql(connect_kwargs),
+                                                   dialect='postgresql')
             
         finally:
             connection.close()
 
     @staticmethod
-    def execute_mysql_import(*, db_config, db_schema_name, table_name, csv_file, trample, create_table_sql_file, import_data_sql_file):
+    def execute_mysql_import(*, db_config, db_schema_name, table_name, csv_file, trample, create_table_sql_file, import_data_sql_file, post_import_files=None, caller_script_dir=None, verify_count=False, perf_profile=None, load_chunks=1, quote_char='"'):
         """
         Execute MySQL import process.
         
@@ -664,112 +1468,138 @@ class ImportExecutor:
             db_config (dict): Database configuration
             db_schema_name (str): Database schema name
             table_name (str): Table name
-            csv_file (str): Path to CSV file
+            csv_file (str): Path to CSV file, optionally gzipped (.gz)
             trample (bool): Whether to overwrite existing data
             create_table_sql_file (str): Name of the CREATE TABLE SQL file
             import_data_sql_file (str): Name of the LOAD DATA SQL file
+            post_import_files (List[Tuple[int, str]], optional): Pre-resolved (order, filepath) post-import
+                SQL files. Defaults to None, which discovers them next to the calling script.
+            caller_script_dir (str, optional): Directory of the generated import script, holding its SQL
+                files. Defaults to None, which finds it by walking the call stack.
+            verify_count (bool): Whether to count the loaded rows with SELECT COUNT(*) and compare them
+                with the count LOAD DATA reported. This scans the whole table. Defaults to False.
+            perf_profile (str, optional): 'bulk' raises the session's insert, sort and temporary table
+                buffers for the load. Defaults to None, which keeps the server's settings.
+            load_chunks (int): Split large uncompressed files into up to this many parts loaded
+                concurrently on separate connections. Parts commit independently, so a failed load can
+                leave some rows behind. Only done when the LOAD DATA statement has ESCAPED BY ''.
+                Defaults to 1 (a single LOAD DATA).
+            quote_char (str): The CSV file's quote character, used to find record boundaries
+                when splitting. Defaults to '"'.
         """
-        try:
-            import pymysql
-        except ImportError as e:
-            from .exceptions import ImportExecutionError
+        pymysql = _get_pymysql()
+        
+        if perf_profile not in _MYSQL_PERF_PROFILES:
+            raise ValueError(f"Unknown perf_profile {perf_profile!r}; expected one of: bulk")
+        
+        if csv_file.endswith('.gz') and not _LOAD_LOCAL_SENDER_INSTALLED:
             raise ImportExecutionError(
-                "pymysql library is required for MySQL imports. Install with: pip install pymysql",
-                script_type="MySQL",
-                original_error=e
+                "Gzipped CSV files need a pymysql version whose LOAD DATA LOCAL sender csviper can replace. "
+                "Decompress the file first or upgrade pymysql.",
+                script_type="MySQL"
             )
         
         # Load SQL files
-        create_table_sql = ImportExecutor.load_sql_file(create_table_sql_file)
-        import_data_sql = ImportExecutor.load_sql_file(import_data_sql_file)
+        create_table_sql = ImportExecutor.load_sql_file(create_table_sql_file, caller_script_dir)
+        import_data_template = ImportExecutor.load_sql_file(import_data_sql_file, caller_script_dir)
         
         # Replace placeholders
         csv_full_path = os.path.abspath(csv_file)
         create_table_sql = ImportExecutor.replace_sql_placeholders(create_table_sql, db_schema_name, table_name, csv_full_path)
-        import_data_sql = ImportExecutor.replace_sql_placeholders(import_data_sql, db_schema_name, table_name, csv_full_path)
+        import_data_sql = ImportExecutor.replace_sql_placeholders(import_data_template, db_schema_name, table_name, csv_full_path)
         
-        # Connect to database
-        try:
-            connection = pymysql.connect(
-                host=db_config['DB_HOST'],
-                port=int(db_config['DB_PORT']),
-                user=db_config['DB_USER'],
-                password=db_config['DB_PASSWORD'],
-                database=db_config['DB_NAME'],
-                local_infile=True
-            )
-        except pymysql.Error as e:
-            from .exceptions import DatabaseConnectionError
-            connection_details = {
-                'host': db_config['DB_HOST'],
-                'port': db_config['DB_PORT'],
-                'user': db_config['DB_USER'],
-                'database': db_config['DB_NAME']
-            }
-            raise DatabaseConnectionError(
-                f"Failed to connect to MySQL database: {str(e)}",
-                db_type="MySQL",
-                connection_details=connection_details
-            )
-        except Exception as e:
-            from .exceptions import DatabaseConnectionError
-            raise DatabaseConnectionError(
-                f"Unexpected error connecting to MySQL database: {str(e)}",
-                db_type="MySQL"
-            )
+        # Table name for the statements built here, quoted once
+        qualified_table = f"{_quote_mysql_identifier(db_schema_name)}.{_quote_mysql_identifier(table_name)}"
         
-        try:
+        # Connect to database, reusing an idle connection from an earlier import when there is one
+        with _pooled_mysql_connection(db_config) as connection:
             with connection.cursor() as cursor:
-                # Check if table exists
-                cursor.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = %s AND table_name = %s", (db_schema_name, table_name))
-                table_exists = cursor.fetchone()[0] > 0
-
-                if table_exists:
-                    if not trample:
+                # Execute CREATE TABLE statements
+                statements = list(_split_sql_statements(create_table_sql, 'mysql'))
+                
+                if trample:
+                    # Dropped just before the CREATE TABLE, so no existence check is needed
+                    click.echo(f"Trample is True. Dropping table {db_schema_name}.{table_name} if it exists.")
+                    statements.insert(0, f"DROP TABLE IF EXISTS {qualified_table}")
+                else:
+                    # Check if table exists. Selecting no rows from it only needs the table definition,
+                    # where an information_schema query scans the data dictionary.
+                    try:
+                        cursor.execute(f"SELECT 1 FROM {qualified_table} LIMIT 0")
+                        table_exists = True
+                    except pymysql.MySQLError as e:
+                        if e.args[0] not in (pymysql.constants.ER.NO_SUCH_TABLE, pymysql.constants.ER.BAD_DB_ERROR):
+                            raise
+                        table_exists = False
+                    
+                    if table_exists:
                         click.echo(Colors.dark_red(f"Warning: Table {db_schema_name}.{table_name} already exists. Skipping import. Use --trample to overwrite."))
                         return
-                    else:
-                        click.echo(f"Table {db_schema_name}.{table_name} exists and trample is True. Dropping table.")
-                        cursor.execute(f"DROP TABLE `{db_schema_name}`.`{table_name}`")
-
-                # Execute CREATE TABLE statements
-                statements = [stmt.strip() for stmt in create_table_sql.split(';') if stmt.strip()]
-                for statement in statements:
-                    if statement:
-                        click.echo(f"Executing: {statement}...")
+                
+                if statements:
+                    # One write for the whole progress listing rather than one per statement
+                    click.echo("\n".join(f"Executing: {statement}..." for statement in statements))
+                    for statement in statements:
                         cursor.execute(statement)
                 
-                # Execute LOAD DATA statement
+                # Execute LOAD DATA statement. Uniqueness and foreign key checks are
+                # relaxed for the load so edited schemas with keys don't pay per-row lookups;
+                # they are restored before the connection goes back to the pool (a failed
+                # import closes its connection instead).
                 click.echo("Importing data...")
-                cursor.execute(import_data_sql)
+                split_load = load_chunks > 1 and not csv_full_path.endswith('.gz') and _LOAD_LOCAL_SENDER_INSTALLED
+                if split_load and not _NO_ESCAPE_RE.search(import_data_template):
+                    # An escaped quote doesn't end a field, so counting quotes can't find record boundaries
+                    click.echo("Loading the file in one part; splitting it needs ESCAPED BY '' in the LOAD DATA statement")
+                    split_load = False
+                if split_load:
+                    # The other connections can only load into the table once it is committed
+                    connection.commit()
+                    row_count = _load_mysql_chunks(
+                        db_config, csv_full_path, import_data_template, db_schema_name, table_name, load_chunks,
+                        perf_profile, quote_char
+                    )
+                else:
+                    cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0" + _MYSQL_PERF_PROFILES[perf_profile][0])
+                    server_side_sql = _server_side_load_sql(cursor, db_config, csv_full_path, import_data_sql)
+                    try:
+                        if server_side_sql is None:
+                            cursor.execute(import_data_sql)
+                        else:
+                            cursor.execute(server_side_sql)
+                    except pymysql.MySQLError as e:
+                        # The server could not read the file after all (e.g. it runs in a container
+                        # or lacks the FILE privilege); upload it from the client instead
+                        if server_side_sql is None or e.args[0] not in _SERVER_INFILE_ERRORS:
+                            raise
+                        click.echo(f"Server could not read the CSV file directly ({e.args[1]}); uploading it instead")
+                        cursor.execute(import_data_sql)
+                    # Row count reported by the LOAD DATA statement; counting the rows
+                    # with a query would scan the whole freshly loaded table
+                    row_count = cursor.rowcount
+                    cursor.execute("SET SESSION unique_checks = 1, foreign_key_checks = 1" + _MYSQL_PERF_PROFILES[perf_profile][1])
+                
+                if row_count is not None and row_count >= 0:
+                    click.echo(f"✓ Successfully imported {row_count:,} rows")
+                else:
+                    click.echo("✓ Successfully imported rows (row count unavailable)")
                 
-                # Get row count
-                cursor.execute(f"SELECT COUNT(*) FROM {db_schema_name}.{table_name}")
-                row_count = cursor.fetchone()[0]
-                click.echo(f"✓ Successfully imported {row_count:,} rows")
+                if verify_count:
+                    cursor.execute(f"SELECT COUNT(*) FROM {qualified_table}")
+                    table_count = cursor.fetchone()[0]
+                    if row_count is not None and row_count >= 0 and table_count != row_count:
+                        click.echo(Colors.dark_red(f"Warning: Table has {table_count:,} rows but LOAD DATA reported {row_count:,}"))
+                    else:
+                        click.echo(f"✓ Verified {table_count:,} rows in {db_schema_name}.{table_name}")
             
             connection.commit()
             
             # Execute post-import SQL files
-            # Get the directory of the calling script by walking up the stack
-            # to find the first frame that's not in the csviper package
-            import inspect
-            frame = inspect.currentframe()
-            script_dir = None
-            try:
-                while frame:
-                    frame = frame.f_back
-                    if frame and '__file__' in frame.f_globals:
-                        file_path = frame.f_globals['__file__']
-                        # Skip frames from the csviper package itself
-                        if 'csviper' not in file_path or file_path.endswith(('go.mysql.py', 'go.postgresql.py')):
-                            script_dir = os.path.dirname(os.path.abspath(file_path))
-                            break
-            finally:
-                del frame
+            # Callers that already know the file list can pass it and skip discovery
+            if post_import_files is None:
+                # Directory of the generated script that called into csviper
+                script_dir = caller_script_dir or _caller_script_dir()
             
-            post_import_files = ImportExecutor.find_post_import_sql_files(script_dir, 'mysql')
-            ImportExecutor.execute_post_import_sql(connection, post_import_files, db_schema_name, table_name, use_colors=False)
-            
-        finally:
-            connection.close()
+                post_import_files = ImportExecutor.find_post_import_sql_files(script_dir, 'mysql')
+            ImportExecutor.execute_post_import_sql(connection, post_import_files, db_schema_name, table_name, use_colors=False,
+                                                   dialect='mysql')
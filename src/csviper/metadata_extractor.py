@@ -3,19 +3,198 @@ CSV Metadata Extraction for CSViper
 """
 
 import os
+import io
+import atexit
 import csv
 import json
 import hashlib
+import codecs
 import chardet
 import re
-from typing import Dict, Any, List, Optional
+import logging
+from collections import Counter
+from itertools import count, islice
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 import click
 from .column_normalizer import ColumnNormalizer
+from .csv_ranges import split_csv_ranges
 from .exceptions import (
     CSVFileError, CSVParsingError, CSVEncodingError, 
     CSVValidationError, MetadataError, FileSystemError
 )
 
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow
+    import pyarrow.csv as pyarrow_csv
+    import pyarrow.compute as pyarrow_compute
+except ImportError:
+    pyarrow = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Bytes of CSV text pyarrow parses per record batch
+_ARROW_BLOCK_SIZE = 8 << 20
+
+# Hash used for new column_headers_hash values. Metadata written before the
+# algorithm was recorded holds a 32-character MD5 digest.
+_HEADERS_HASH_ALGORITHM = 'blake2b-64'
+
+
+# Read size for hashing whole CSV files
+_CONTENT_HASH_READ_SIZE = 1 << 20
+
+# Byte order marks and the codecs that strip them; UTF-32 is checked before UTF-16
+# because the UTF-32-LE mark starts with the UTF-16-LE one
+_ENCODING_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Encodings detected by earlier runs, so unchanged files skip detection
+_ENCODING_CACHE_PATH = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'csviper', 'encodings.json'
+)
+_ENCODING_CACHE_MAX_ENTRIES = 256
+
+# Delimiters tried when csv.Sniffer cannot classify a sample
+_PROBE_DELIMITERS = (',', '\t', ';', '|')
+
+# ASCII-compatible encodings tried, in order, when detection is unreliable or fails.
+# iso-8859-1 maps every byte, so it is chosen whenever it is listed first.
+_FALLBACK_ENCODINGS = ('iso-8859-1', 'windows-1252', 'cp1252', 'utf-8')
+
+# Buffer size for opens that stream a whole CSV file or range; the default is 8 KiB
+_CSV_READ_BUFFER_SIZE = 1 << 20
+
+# Rows the csv module width scan reads per batch
+_WIDTH_SCAN_BATCH_ROWS = 10000
+
+# Smallest file the csv module scan splits across worker processes
+_PARALLEL_WIDTHS_MIN_BYTES = 64 << 20
+
+
+def _content_hash_enabled() -> bool:
+    """Whether CSVIPER_CONTENT_HASH=1 asks for whole-file content hashes in metadata."""
+    return os.environ.get('CSVIPER_CONTENT_HASH') == '1'
+
+
+def _compute_file_content_hash(file_path: str) -> str:
+    """
+    Hash the raw bytes of a file with one sequential read.
+    
+    Args:
+        file_path (str): Path to the file
+        
+    Returns:
+        str: 32-character BLAKE2b hex digest
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb', buffering=0) as f:
+        buffer = bytearray(_CONTENT_HASH_READ_SIZE)
+        view = memoryview(buffer)
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            hasher.update(view[:n])
+    return hasher.hexdigest()
+
+
+def _column_headers_hash(original_columns: List[str], algorithm: str = _HEADERS_HASH_ALGORITHM) -> str:
+    """
+    Fingerprint the column headers for the metadata cache check.
+    
+    Names are joined with NUL, which cannot collide with a comma inside a
+    quoted header the way the legacy MD5 form (joined with ',') can.
+    
+    Args:
+        original_columns (List[str]): Original column names
+        algorithm (str): 'blake2b-64', or 'md5' for metadata from older versions
+        
+    Returns:
+        str: Hex digest (16 characters for blake2b-64, 32 for md5)
+    """
+    if algorithm == 'md5':
+        return hashlib.md5(','.join(map(str.lower, original_columns)).encode()).hexdigest()
+    column_headers_bytes = '\0'.join(map(str.lower, original_columns)).encode()
+    return hashlib.blake2b(column_headers_bytes, digest_size=8).hexdigest()
+
+
+def _widths_by_column_name(original_columns: List[str], lengths: List[int]) -> Dict[str, int]:
+    """
+    Key per-position maximum lengths by original column name.
+    
+    Args:
+        original_columns (List[str]): Original column names
+        lengths (List[int]): Maximum length for each column position
+        
+    Returns:
+        Dict[str, int]: Maximum length for each original column name; a repeated
+            name keeps the widest of its columns
+    """
+    max_lengths = {orig_col: 0 for orig_col in original_columns}
+    for orig_col, length in zip(original_columns, lengths):
+        if length > max_lengths[orig_col]:
+            max_lengths[orig_col] = length
+    return max_lengths
+
+
+def _column_widths_in_range(file_path: str, start: int, end: int, delimiter: str, quote_char: str,
+                            encoding: str, column_count: int) -> Tuple[List[int], int, bool]:
+    """
+    Scan the records in one byte range of a CSV file for maximum column lengths.
+    
+    Runs in a worker process; the range must start and end on record boundaries.
+    
+    Args:
+        file_path (str): Path to CSV file
+        start (int): Byte offset of the first record; 0 means the range includes the header
+        end (int): Byte offset just past the last record
+        delimiter (str): CSV delimiter
+        quote_char (str): CSV quote character
+        encoding (str): File encoding
+        column_count (int): Expected number of columns
+        
+    Returns:
+        Tuple[List[int], int, bool]: Maximum length per column position, data rows
+            scanned, and whether the scan stopped at a row with the wrong number of columns
+    """
+    def lines(f):
+        remaining = end - start
+        while remaining > 0:
+            line = f.readline()
+            if not line:
+                break
+            remaining -= len(line)
+            yield line
+    
+    lengths = [0] * column_count
+    rows = 0
+    with open(file_path, 'rb', buffering=_CSV_READ_BUFFER_SIZE) as f:
+        f.seek(start)
+        reader = csv.reader(codecs.iterdecode(lines(f), encoding), delimiter=delimiter, quotechar=quote_char)
+        if start == 0:
+            next(reader, None)
+        for row in reader:
+            rows += 1
+            if len(row) != column_count:
+                return lengths, rows, True
+            for i, value in enumerate(row):
+                length = len(value)
+                if length > lengths[i]:
+                    lengths[i] = length
+    return lengths, rows, False
+
 
 class Colors:
     """ANSI color codes for terminal output"""
@@ -48,16 +227,13 @@ class CSVMetadataExtractor:
             return
         
         column_mapping = metadata['column_name_mapping']
-        normalized_values = list(column_mapping.values())
+        
+        # Common case: every normalized name is distinct
+        if len(set(column_mapping.values())) == len(column_mapping):
+            return
         
         # Check for duplicates
-        seen = set()
-        duplicates = set()
-        for value in normalized_values:
-            if value in seen:
-                duplicates.add(value)
-            else:
-                seen.add(value)
+        duplicates = {value for value, count in Counter(column_mapping.values()).items() if count > 1}
         
         if duplicates:
             # Find which original columns map to the duplicate normalized names
@@ -137,32 +313,33 @@ class CSVMetadataExtractor:
         # Generate new metadata
         file_size = os.path.getsize(full_path_to_csv_file)
         
+        # Resolve the encoding once; every step below reads the file with it
+        detected_encoding = CSVMetadataExtractor._get_best_encoding(full_path_to_csv_file)
+        
         # Detect CSV format using csv.Sniffer
-        delimiter, quote_char = CSVMetadataExtractor._detect_csv_format(full_path_to_csv_file)
+        delimiter, quote_char = CSVMetadataExtractor._detect_csv_format(full_path_to_csv_file, detected_encoding)
         
         # Extract and normalize column names
         original_columns, normalized_columns = CSVMetadataExtractor._extract_column_names(
-            full_path_to_csv_file, delimiter, quote_char
+            full_path_to_csv_file, delimiter, quote_char, detected_encoding
         )
         
         # Create column mapping by position to handle duplicate original names
+        name_counts = Counter(original_columns)
         column_mapping = {}
         for i, (orig, norm) in enumerate(zip(original_columns, normalized_columns)):
             # Use position-based key for duplicates
-            key = f"{orig} (column {i+1})" if original_columns.count(orig) > 1 else orig
+            key = f"{orig} (column {i+1})" if name_counts[orig] > 1 else orig
             column_mapping[key] = norm
         
         # Analyze column widths
         max_lengths = CSVMetadataExtractor._analyze_column_widths(
-            full_path_to_csv_file, delimiter, quote_char, original_columns, normalized_columns
+            full_path_to_csv_file, delimiter, quote_char, original_columns, normalized_columns,
+            detected_encoding
         )
         
         # Generate column headers hash for caching
-        column_headers_str = ','.join([col.lower() for col in original_columns])
-        column_headers_hash = hashlib.md5(column_headers_str.encode()).hexdigest()
-        
-        # Get encoding information for metadata
-        detected_encoding = CSVMetadataExtractor._get_best_encoding(full_path_to_csv_file)
+        column_headers_hash = _column_headers_hash(original_columns)
         
         # Generate file glob pattern for invoker functionality
         file_glob_pattern = CSVMetadataExtractor._generate_file_glob_pattern(filename)
@@ -186,9 +363,14 @@ class CSVMetadataExtractor:
             "column_name_mapping": column_mapping,
             "max_column_lengths": max_lengths,
             "total_columns": len(original_columns),
-            "column_headers_hash": column_headers_hash
+            "column_headers_hash": column_headers_hash,
+            "column_headers_hash_algorithm": _HEADERS_HASH_ALGORITHM
         }
         
+        # Opt-in whole-file hash; lets an unchanged file reuse this metadata without re-detection
+        if _content_hash_enabled():
+            metadata["file_content_hash"] = _compute_file_content_hash(full_path_to_csv_file)
+        
         # Save metadata to JSON file if output directory is specified
         if output_dir:
             CSVMetadataExtractor._save_metadata_json(metadata, output_dir, filename_without_ext)
@@ -196,13 +378,44 @@ class CSVMetadataExtractor:
         return metadata
     
     @staticmethod
-    def _detect_file_encoding(file_path: str) -> str:
+    def _read_encoding_samples(file_path: str) -> List[bytes]:
+        """
+        Read byte samples from the beginning, middle and end of a file for encoding detection.
+        
+        Args:
+            file_path (str): Path to the file
+            
+        Returns:
+            List[bytes]: Samples, starting with the first 100KB of the file
+        """
+        samples = []
+        file_size = os.path.getsize(file_path)
+        
+        with open(file_path, 'rb') as f:
+            # Read from beginning (first 100KB)
+            samples.append(f.read(100000))
+            
+            # If file is large enough, read from middle and end
+            if file_size > 500000:  # 500KB
+                # Read from middle
+                f.seek(file_size // 2)
+                samples.append(f.read(100000))
+                
+                # Read from near end (but not the very end to avoid incomplete lines)
+                f.seek(max(0, file_size - 200000))
+                samples.append(f.read(100000))
+        
+        return samples
+    
+    @staticmethod
+    def _detect_file_encoding(file_path: str, samples: Optional[List[bytes]] = None) -> str:
         """
         Detect the encoding of a file using chardet by reading a large sample.
         For performance, reads multiple samples from different parts of the file.
         
         Args:
             file_path (str): Path to the file
+            samples (Optional[List[bytes]]): Samples already read by _read_encoding_samples
             
         Returns:
             str: Detected encoding
@@ -211,29 +424,20 @@ class CSVMetadataExtractor:
             CSVEncodingError: If encoding cannot be detected
         """
         try:
-            print(f"DEBUG: Reading file samples for encoding detection...")
+            if samples is None:
+                logger.debug("Reading file samples for encoding detection...")
+                # Read samples from different parts of the file for better detection
+                samples = CSVMetadataExtractor._read_encoding_samples(file_path)
             
-            # Read samples from different parts of the file for better detection
-            samples = []
-            file_size = os.path.getsize(file_path)
-            
-            with open(file_path, 'rb') as f:
-                # Read from beginning (first 100KB)
-                samples.append(f.read(100000))
-                
-                # If file is large enough, read from middle and end
-                if file_size > 500000:  # 500KB
-                    # Read from middle
-                    f.seek(file_size // 2)
-                    samples.append(f.read(100000))
-                    
-                    # Read from near end (but not the very end to avoid incomplete lines)
-                    f.seek(max(0, file_size - 200000))
-                    samples.append(f.read(100000))
+            # A byte order mark or pure ASCII settles the question without the detector
+            encoding = CSVMetadataExtractor._detect_encoding_fast(samples)
+            if encoding is not None:
+                print(f"Detected encoding: {encoding} (confidence: 1.00)")
+                return encoding
             
             # Combine samples for detection
             combined_sample = b''.join(samples)
-            print(f"DEBUG: Analyzing {len(combined_sample):,} bytes for encoding detection...")
+            logger.debug(f"Analyzing {len(combined_sample):,} bytes for encoding detection...")
                 
             result = chardet.detect(combined_sample)
             if result['encoding'] is None:
@@ -260,8 +464,102 @@ class CSVMetadataExtractor:
                 file_path
             )
     
-    # Class-level cache for encoding detection to avoid re-reading large files
+    @staticmethod
+    def _detect_encoding_fast(samples: List[bytes]) -> Optional[str]:
+        """
+        Identify encodings that need no statistical detection: a byte order mark
+        or pure ASCII. chardet reports both with confidence 1.0.
+        
+        Args:
+            samples (List[bytes]): Samples from _read_encoding_samples
+            
+        Returns:
+            Optional[str]: The encoding, or None if chardet is needed
+        """
+        head = samples[0]
+        for bom, encoding in _ENCODING_BOMS:
+            if head.startswith(bom):
+                return encoding
+        
+        # Reported as ascii so _get_best_encoding applies its ASCII-compatible fallbacks
+        if all(sample.isascii() for sample in samples):
+            return 'ascii'
+        return None
+    
+    # Class-level cache for encoding detection to avoid re-reading large files, keyed by
+    # (absolute path, mtime_ns, size) and persisted across runs in _ENCODING_CACHE_PATH
     _encoding_cache = {}
+    _encoding_cache_loaded = False
+    _encoding_cache_dirty = False
+    
+    @staticmethod
+    def _encoding_cache_key(file_path: str) -> tuple:
+        """
+        Build the encoding cache key for a file; a modified file gets a new key.
+        
+        Args:
+            file_path (str): Path to the file
+            
+        Returns:
+            tuple: (absolute path, mtime in nanoseconds, size in bytes)
+        """
+        stat = os.stat(file_path)
+        return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    
+    @staticmethod
+    def _load_encoding_cache() -> None:
+        """
+        Load encodings detected by earlier runs, once per process.
+        
+        A missing or unreadable cache file just leaves the cache empty.
+        """
+        if CSVMetadataExtractor._encoding_cache_loaded:
+            return
+        CSVMetadataExtractor._encoding_cache_loaded = True
+        try:
+            with open(_ENCODING_CACHE_PATH, 'r', encoding='utf-8') as cache_file:
+                entries = json.load(cache_file)
+            for path, mtime_ns, size, encoding in entries:
+                CSVMetadataExtractor._encoding_cache.setdefault((path, mtime_ns, size), encoding)
+        except (OSError, ValueError, TypeError) as e:
+            logger.debug(f"Encoding cache not loaded: {e}")
+    
+    @staticmethod
+    def _save_encoding_cache() -> None:
+        """
+        Write the most recently used encoding cache entries to disk at exit.
+        
+        Failures are ignored; the cache only saves detection time.
+        """
+        if not CSVMetadataExtractor._encoding_cache_dirty:
+            return
+        entries = [
+            [path, mtime_ns, size, encoding]
+            for (path, mtime_ns, size), encoding in CSVMetadataExtractor._encoding_cache.items()
+        ][-_ENCODING_CACHE_MAX_ENTRIES:]
+        try:
+            os.makedirs(os.path.dirname(_ENCODING_CACHE_PATH), exist_ok=True)
+            temp_path = f"{_ENCODING_CACHE_PATH}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as cache_file:
+                json.dump(entries, cache_file)
+            os.replace(temp_path, _ENCODING_CACHE_PATH)
+        except OSError as e:
+            logger.debug(f"Encoding cache not saved: {e}")
+    
+    @staticmethod
+    def _remember_encoding(cache_key: tuple, encoding: str) -> None:
+        """
+        Record a detected encoding in the cache and schedule the cache to be saved.
+        
+        Args:
+            cache_key (tuple): Key from _encoding_cache_key
+            encoding (str): Encoding to use for the file
+        """
+        CSVMetadataExtractor._encoding_cache.pop(cache_key, None)
+        CSVMetadataExtractor._encoding_cache[cache_key] = encoding
+        if not CSVMetadataExtractor._encoding_cache_dirty:
+            CSVMetadataExtractor._encoding_cache_dirty = True
+            atexit.register(CSVMetadataExtractor._save_encoding_cache)
     
     @staticmethod
     def _get_best_encoding(file_path: str) -> str:
@@ -275,83 +573,115 @@ class CSVMetadataExtractor:
         Returns:
             str: Best encoding to use for reading the file
         """
-        print(f"DEBUG: _get_best_encoding called for {os.path.basename(file_path)}")
+        logger.debug(f"_get_best_encoding called for {os.path.basename(file_path)}")
         
         # Check cache first
-        if file_path in CSVMetadataExtractor._encoding_cache:
-            cached_encoding = CSVMetadataExtractor._encoding_cache[file_path]
-            print(f"DEBUG: Using cached encoding: {cached_encoding}")
+        CSVMetadataExtractor._load_encoding_cache()
+        cache_key = CSVMetadataExtractor._encoding_cache_key(file_path)
+        if cache_key in CSVMetadataExtractor._encoding_cache:
+            cached_encoding = CSVMetadataExtractor._encoding_cache[cache_key]
+            logger.debug(f"Using cached encoding: {cached_encoding}")
+            # Mark as most recently used so it survives trimming
+            CSVMetadataExtractor._remember_encoding(cache_key, cached_encoding)
             return cached_encoding
         
-        print(f"DEBUG: No cached encoding found, detecting...")
+        logger.debug("No cached encoding found, detecting...")
         
-        # First detect the encoding using chardet (reads entire file)
-        detected_encoding = CSVMetadataExtractor._detect_file_encoding(file_path)
-        print(f"DEBUG: Chardet detected encoding: {detected_encoding}")
+        # One read serves both chardet and the decode checks below; the first
+        # sample is the file's first 100KB, which is what each check decodes
+        logger.debug("Reading file samples for encoding detection...")
+        samples = CSVMetadataExtractor._read_encoding_samples(file_path)
+        head = samples[0]
+        
+        # First detect the encoding using chardet
+        detected_encoding = CSVMetadataExtractor._detect_file_encoding(file_path, samples)
+        logger.debug(f"Chardet detected encoding: {detected_encoding}")
         
         # Handle problematic encodings
         if detected_encoding.lower() == 'ascii':
-            print(f"DEBUG: ASCII detected, trying fallback encodings...")
+            logger.debug("ASCII detected, trying fallback encodings...")
             # ASCII detection is often wrong when files contain extended characters
             # Try common encodings that are ASCII-compatible, but only test with a sample
-            for fallback_encoding in ['iso-8859-1', 'windows-1252', 'cp1252', 'utf-8']:
-                print(f"DEBUG: Testing fallback encoding: {fallback_encoding}")
-                try:
-                    with open(file_path, 'r', encoding=fallback_encoding) as f:
-                        # Read a reasonable sample to verify encoding works
-                        f.read(100000)  # Read 100KB sample
-                    print(f"ASCII detection was insufficient, using {fallback_encoding} instead")
-                    CSVMetadataExtractor._encoding_cache[file_path] = fallback_encoding
-                    print(f"DEBUG: Cached encoding {fallback_encoding} for future use")
-                    return fallback_encoding
-                except UnicodeDecodeError as e:
-                    print(f"DEBUG: Fallback encoding {fallback_encoding} failed: {e}")
-                    continue
+            fallback_encoding = CSVMetadataExtractor._first_decodable_encoding(head)
+            if fallback_encoding is not None:
+                print(f"ASCII detection was insufficient, using {fallback_encoding} instead")
+                CSVMetadataExtractor._remember_encoding(cache_key, fallback_encoding)
+                logger.debug(f"Cached encoding {fallback_encoding} for future use")
+                return fallback_encoding
             
             # If all fallbacks fail, use the detected encoding anyway
             print(f"Warning: All encoding fallbacks failed, using detected encoding: {detected_encoding}")
-            CSVMetadataExtractor._encoding_cache[file_path] = detected_encoding
+            CSVMetadataExtractor._remember_encoding(cache_key, detected_encoding)
             return detected_encoding
         
-        print(f"DEBUG: Non-ASCII encoding detected, verifying with sample...")
+        logger.debug("Non-ASCII encoding detected, verifying with sample...")
         # For non-ASCII detected encodings, verify they work with a sample
         try:
-            with open(file_path, 'r', encoding=detected_encoding) as f:
-                # Read a reasonable sample to verify encoding works
-                f.read(100000)  # Read 100KB sample
-            print(f"DEBUG: Detected encoding {detected_encoding} verified successfully")
-            CSVMetadataExtractor._encoding_cache[file_path] = detected_encoding
-            print(f"DEBUG: Cached encoding {detected_encoding} for future use")
+            # Decode the first 100KB to verify encoding works
+            CSVMetadataExtractor._decode_sample(head, detected_encoding)
+            logger.debug(f"Detected encoding {detected_encoding} verified successfully")
+            CSVMetadataExtractor._remember_encoding(cache_key, detected_encoding)
+            logger.debug(f"Cached encoding {detected_encoding} for future use")
             return detected_encoding
         except UnicodeDecodeError:
             # If detected encoding fails, try common fallbacks
             print(f"Detected encoding '{detected_encoding}' failed, trying fallbacks...")
-            for fallback_encoding in ['iso-8859-1', 'windows-1252', 'cp1252', 'utf-8']:
-                print(f"DEBUG: Testing fallback encoding: {fallback_encoding}")
-                try:
-                    with open(file_path, 'r', encoding=fallback_encoding) as f:
-                        # Read a reasonable sample to verify encoding works
-                        f.read(100000)  # Read 100KB sample
-                    print(f"Using fallback encoding: {fallback_encoding}")
-                    CSVMetadataExtractor._encoding_cache[file_path] = fallback_encoding
-                    print(f"DEBUG: Cached encoding {fallback_encoding} for future use")
-                    return fallback_encoding
-                except UnicodeDecodeError as e:
-                    print(f"DEBUG: Fallback encoding {fallback_encoding} failed: {e}")
-                    continue
+            fallback_encoding = CSVMetadataExtractor._first_decodable_encoding(head)
+            if fallback_encoding is not None:
+                print(f"Using fallback encoding: {fallback_encoding}")
+                CSVMetadataExtractor._remember_encoding(cache_key, fallback_encoding)
+                logger.debug(f"Cached encoding {fallback_encoding} for future use")
+                return fallback_encoding
             
             # If all fallbacks fail, return the detected encoding anyway
             print(f"Warning: All fallback encodings failed, using detected encoding: {detected_encoding}")
-            CSVMetadataExtractor._encoding_cache[file_path] = detected_encoding
+            CSVMetadataExtractor._remember_encoding(cache_key, detected_encoding)
             return detected_encoding
     
     @staticmethod
-    def _detect_csv_format(file_path: str) -> tuple:
+    def _first_decodable_encoding(sample: bytes) -> Optional[str]:
+        """
+        Find the first fallback encoding that can decode a sample from the start of a file.
+        
+        Args:
+            sample (bytes): Bytes from the start of the file
+            
+        Returns:
+            Optional[str]: The first encoding in _FALLBACK_ENCODINGS that fits, or None
+        """
+        for fallback_encoding in _FALLBACK_ENCODINGS:
+            logger.debug(f"Testing fallback encoding: {fallback_encoding}")
+            try:
+                CSVMetadataExtractor._decode_sample(sample, fallback_encoding)
+                return fallback_encoding
+            except UnicodeDecodeError as e:
+                logger.debug(f"Fallback encoding {fallback_encoding} failed: {e}")
+        return None
+    
+    @staticmethod
+    def _decode_sample(sample: bytes, encoding: str) -> None:
+        """
+        Decode a sample from the start of a file, raising if the encoding doesn't fit it.
+        
+        A multibyte character cut off at the end of the sample is not an error.
+        
+        Args:
+            sample (bytes): Bytes from the start of the file
+            encoding (str): Encoding to check
+            
+        Raises:
+            UnicodeDecodeError: If the sample is not valid in the encoding
+        """
+        codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+    
+    @staticmethod
+    def _detect_csv_format(file_path: str, encoding: str) -> tuple:
         """
         Detect CSV delimiter and quote character using csv.Sniffer.
         
         Args:
             file_path (str): Path to CSV file
+            encoding (str): File encoding, from _get_best_encoding
             
         Returns:
             tuple: (delimiter, quote_char)
@@ -360,9 +690,6 @@ class CSVMetadataExtractor:
             CSVParsingError: If CSV format cannot be detected
             CSVEncodingError: If file encoding issues are encountered
         """
-        # Get the best encoding for this file
-        encoding = CSVMetadataExtractor._get_best_encoding(file_path)
-        
         try:
             with open(file_path, 'r', newline='', encoding=encoding) as csvfile:
                 # Read a sample of the file for sniffing
@@ -371,10 +698,18 @@ class CSVMetadataExtractor:
                 
                 # Use csv.Sniffer to detect format
                 sniffer = csv.Sniffer()
-                dialect = sniffer.sniff(sample)
+                try:
+                    dialect = sniffer.sniff(sample)
+                    delimiter, quote_char = dialect.delimiter, dialect.quotechar
+                except csv.Error:
+                    delimiter = CSVMetadataExtractor._probe_delimiter(sample)
+                    if delimiter is None:
+                        raise
+                    quote_char = '"'
+                    logger.debug(f"Sniffer failed, probed delimiter {delimiter!r}")
                 
                 # Verify the dialect works by trying to read the first few lines
-                reader = csv.reader(csvfile, dialect)
+                reader = csv.reader(csvfile, delimiter=delimiter, quotechar=quote_char)
                 header = next(reader)
                 first_row = next(reader, None)
                 
@@ -384,8 +719,8 @@ class CSVMetadataExtractor:
                 if first_row is None:
                     raise CSVParsingError("CSV file contains only a header row, no data", file_path)
                 
-                print(f"DEBUG: CSV format detection completed successfully")
-                return dialect.delimiter, dialect.quotechar
+                logger.debug("CSV format detection completed successfully")
+                return delimiter, quote_char
                 
         except UnicodeDecodeError as e:
             raise CSVEncodingError(
@@ -403,7 +738,31 @@ class CSVMetadataExtractor:
             raise CSVParsingError(f"Unexpected error while detecting CSV format: {e}", file_path)
     
     @staticmethod
-    def _extract_column_names(file_path: str, delimiter: str, quote_char: str) -> tuple:
+    def _probe_delimiter(sample: str) -> Optional[str]:
+        """
+        Pick a delimiter for a sample that csv.Sniffer could not classify.
+        
+        Each candidate parses the header and first row of the in-memory sample;
+        the one giving the most columns in both rows wins.
+        
+        Args:
+            sample (str): Text from the start of the file
+            
+        Returns:
+            Optional[str]: Delimiter splitting both rows into more than one column, or None
+        """
+        best_delimiter, best_columns = None, 1
+        for delimiter in _PROBE_DELIMITERS:
+            rows = list(islice(csv.reader(io.StringIO(sample), delimiter=delimiter), 2))
+            if len(rows) < 2:
+                continue
+            columns = min(len(rows[0]), len(rows[1]))
+            if columns > best_columns:
+                best_delimiter, best_columns = delimiter, columns
+        return best_delimiter
+    
+    @staticmethod
+    def _extract_column_names(file_path: str, delimiter: str, quote_char: str, encoding: str) -> tuple:
         """
         Extract and normalize column names from CSV header.
         
@@ -411,6 +770,7 @@ class CSVMetadataExtractor:
             file_path (str): Path to CSV file
             delimiter (str): CSV delimiter
             quote_char (str): CSV quote character
+            encoding (str): File encoding, from _get_best_encoding
             
         Returns:
             tuple: (original_columns, normalized_column_mapping)
@@ -419,9 +779,6 @@ class CSVMetadataExtractor:
             CSVEncodingError: If file encoding issues are encountered
             CSVParsingError: If CSV parsing fails
         """
-        # Get the best encoding for this file
-        encoding = CSVMetadataExtractor._get_best_encoding(file_path)
-        
         try:
             with open(file_path, 'r', newline='', encoding=encoding) as csvfile:
                 reader = csv.reader(csvfile, delimiter=delimiter, quotechar=quote_char)
@@ -444,7 +801,8 @@ class CSVMetadataExtractor:
     
     @staticmethod
     def _analyze_column_widths(file_path: str, delimiter: str, quote_char: str, 
-                             original_columns: List[str], normalized_columns: List[str]) -> Dict[str, int]:
+                             original_columns: List[str], normalized_columns: List[str],
+                             encoding: str) -> Dict[str, int]:
         """
         Analyze maximum string length for each column in the CSV file.
         
@@ -454,6 +812,7 @@ class CSVMetadataExtractor:
             quote_char (str): CSV quote character
             original_columns (List[str]): Original column names
             normalized_columns (List[str]): List of normalized column names
+            encoding (str): File encoding, from _get_best_encoding
             
         Returns:
             Dict[str, int]: Maximum length for each original column name
@@ -462,48 +821,77 @@ class CSVMetadataExtractor:
             CSVValidationError: If rows have inconsistent column counts
             CSVEncodingError: If file encoding issues are encountered
         """
-        print(f"DEBUG: _analyze_column_widths starting for {len(original_columns)} columns...")
+        logger.debug(f"_analyze_column_widths starting for {len(original_columns)} columns...")
         
-        max_lengths = {orig_col: 0 for orig_col in original_columns}
         expected_column_count = len(original_columns)
+        lengths = [0] * expected_column_count
+        
+        logger.debug(f"Using encoding {encoding} for column width analysis")
         
-        # Get the best encoding for this file
-        encoding = CSVMetadataExtractor._get_best_encoding(file_path)
-        print(f"DEBUG: Using encoding {encoding} for column width analysis")
+        if pyarrow is not None:
+            try:
+                return CSVMetadataExtractor._analyze_column_widths_arrow(
+                    file_path, delimiter, quote_char, encoding, original_columns
+                )
+            except (ValueError, LookupError) as e:
+                # Parse and decoding errors (pyarrow.ArrowInvalid is a ValueError), rows that
+                # may be blank lines, and unknown codecs: rescan with the csv module, which
+                # reports problems by row number
+                logger.debug(f"pyarrow could not read the file ({e}), falling back to the csv module...")
         
         try:
-            print(f"DEBUG: Opening file for column width analysis...")
-            with open(file_path, 'r', newline='', encoding=encoding) as csvfile:
+            ranges = CSVMetadataExtractor._column_width_ranges(file_path, quote_char, encoding)
+            if ranges:
+                parallel_lengths = CSVMetadataExtractor._analyze_column_widths_parallel(
+                    file_path, ranges, delimiter, quote_char, encoding, expected_column_count
+                )
+                if parallel_lengths is not None:
+                    return _widths_by_column_name(original_columns, parallel_lengths)
+                # A part hit a row with the wrong column count; rescan serially to
+                # report it by row number, or to recover from a split that a stray
+                # quote character misplaced
+                logger.debug("Parallel scan found a malformed row, rescanning serially...")
+            
+            logger.debug("Opening file for column width analysis...")
+            with open(file_path, 'r', newline='', encoding=encoding, buffering=_CSV_READ_BUFFER_SIZE) as csvfile:
                 reader = csv.reader(csvfile, delimiter=delimiter, quotechar=quote_char)
                 
-                print(f"DEBUG: Skipping header row...")
+                logger.debug("Skipping header row...")
                 # Skip header row
                 next(reader)
                 
-                print(f"DEBUG: Starting to process data rows...")
+                logger.debug("Starting to process data rows...")
+                # Rows are read in batches so row counting and progress happen per batch
                 row_number = 1
-                for row in reader:
-                    row_number += 1
+                for batch_number in count(1):
+                    batch = list(islice(reader, _WIDTH_SCAN_BATCH_ROWS))
+                    if not batch:
+                        break
                     
-                    # Print progress every 100,000 rows
-                    if row_number % 100000 == 0:
-                        print(f"DEBUG: Processed {row_number:,} rows...")
+                    for batch_offset, row in enumerate(batch, 1):
+                        # Check column count consistency
+                        if len(row) != expected_column_count:
+                            bad_row_number = row_number + batch_offset
+                            raise CSVValidationError(
+                                f"Inconsistent column count at row {bad_row_number}: "
+                                f"Expected {expected_column_count} columns, found {len(row)}",
+                                file_path,
+                                bad_row_number
+                            )
+                        
+                        # Track maximum lengths by position; keyed by column name after the scan
+                        for i, value in enumerate(row):
+                            length = len(value)
+                            if length > lengths[i]:
+                                lengths[i] = length
                     
-                    # Check column count consistency
-                    if len(row) != expected_column_count:
-                        raise CSVValidationError(
-                            f"Inconsistent column count at row {row_number}: "
-                            f"Expected {expected_column_count} columns, found {len(row)}",
-                            file_path,
-                            row_number
-                        )
+                    row_number += len(batch)
                     
-                    # Update maximum lengths using original column names as keys
-                    for i, value in enumerate(row):
-                        original_col = original_columns[i]
-                        max_lengths[original_col] = max(max_lengths[original_col], len(str(value)))
+                    # Print progress every 10 batches (100,000 rows)
+                    if batch_number % 10 == 0:
+                        logger.debug(f"Processed {row_number:,} rows...")
                 
-                print(f"DEBUG: Column width analysis completed. Processed {row_number:,} total rows.")
+                logger.debug(f"Column width analysis completed. Processed {row_number:,} total rows.")
         
         except UnicodeDecodeError as e:
             raise CSVEncodingError(
@@ -513,7 +901,144 @@ class CSVMetadataExtractor:
         except Exception as e:
             raise CSVValidationError(f"Error analyzing column widths: {e}", file_path)
         
-        return max_lengths
+        return _widths_by_column_name(original_columns, lengths)
+    
+    @staticmethod
+    def _column_width_ranges(file_path: str, quote_char: str, encoding: str) -> List[Tuple[int, int]]:
+        """
+        Split a large CSV file into record-aligned byte ranges for a parallel width scan.
+        
+        Args:
+            file_path (str): Path to CSV file
+            quote_char (str): CSV quote character
+            encoding (str): File encoding
+            
+        Returns:
+            List[Tuple[int, int]]: (start, end) byte offsets, or an empty list when the
+                file is small, only one CPU is available, or the encoding does not
+                write newlines and quotes as single ASCII bytes (e.g. UTF-16)
+        """
+        workers = os.cpu_count() or 1
+        if workers < 2 or os.path.getsize(file_path) < _PARALLEL_WIDTHS_MIN_BYTES:
+            return []
+        
+        try:
+            ascii_compatible = ('a\n' + quote_char).encode(encoding).endswith(('\n' + quote_char).encode('ascii'))
+        except (LookupError, UnicodeError):
+            ascii_compatible = False
+        if not ascii_compatible:
+            return []
+        
+        ranges = split_csv_ranges(file_path, workers, quote_char.encode('ascii'))
+        return ranges if len(ranges) > 1 else []
+    
+    @staticmethod
+    def _analyze_column_widths_parallel(file_path: str, ranges: List[Tuple[int, int]], delimiter: str,
+                                        quote_char: str, encoding: str, column_count: int) -> Optional[List[int]]:
+        """
+        Find maximum column lengths by scanning byte ranges of the file in worker processes.
+        
+        Args:
+            file_path (str): Path to CSV file
+            ranges (List[Tuple[int, int]]): Record-aligned (start, end) byte offsets
+            delimiter (str): CSV delimiter
+            quote_char (str): CSV quote character
+            encoding (str): File encoding
+            column_count (int): Expected number of columns
+            
+        Returns:
+            Optional[List[int]]: Maximum length for each column position, or None if
+                any part has a row with the wrong number of columns
+        """
+        logger.debug(f"Scanning {len(ranges)} parts of the file in parallel...")
+        
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = [
+                executor.submit(_column_widths_in_range, file_path, start, end,
+                                delimiter, quote_char, encoding, column_count)
+                for start, end in ranges
+            ]
+            results = [future.result() for future in futures]
+        
+        lengths = [0] * column_count
+        row_number = 1
+        for part_lengths, rows, malformed in results:
+            if malformed:
+                return None
+            row_number += rows
+            lengths = [max(pair) for pair in zip(lengths, part_lengths)]
+        
+        logger.debug(f"Column width analysis completed. Processed {row_number:,} total rows.")
+        return lengths
+    
+    @staticmethod
+    def _analyze_column_widths_arrow(file_path: str, delimiter: str, quote_char: str, encoding: str,
+                                     original_columns: List[str]) -> Dict[str, int]:
+        """
+        Analyze maximum string length for each column using pyarrow's multithreaded CSV reader.
+        
+        Every column is read as a string, so lengths match len(str(value)) in the
+        csv module scan. pyarrow reads a blank line as a row of empty values, while
+        the csv module reads it as a row with no fields, which fails the column count
+        check; a row with no characters therefore raises ValueError so the caller
+        rescans with the csv module.
+        
+        Args:
+            file_path (str): Path to CSV file
+            delimiter (str): CSV delimiter
+            quote_char (str): CSV quote character
+            encoding (str): File encoding
+            original_columns (List[str]): Original column names
+            
+        Returns:
+            Dict[str, int]: Maximum length for each original column name
+            
+        Raises:
+            ValueError: If the file cannot be parsed or decoded, including rows with the
+                wrong number of columns (pyarrow.ArrowInvalid), or has a row with no characters
+            LookupError: If pyarrow does not know the encoding
+        """
+        logger.debug("Analyzing column widths with pyarrow...")
+        
+        # Positional names, since header names can be blank or repeated
+        column_names = [f"c{i}" for i in range(len(original_columns))]
+        reader = pyarrow_csv.open_csv(
+            file_path,
+            read_options=pyarrow_csv.ReadOptions(
+                column_names=column_names, skip_rows=1, block_size=_ARROW_BLOCK_SIZE,
+                use_threads=True, encoding=encoding
+            ),
+            parse_options=pyarrow_csv.ParseOptions(
+                delimiter=delimiter, quote_char=quote_char, newlines_in_values=True,
+                # Kept as rows of empty values, so they can be found below
+                ignore_empty_lines=False
+            ),
+            convert_options=pyarrow_csv.ConvertOptions(
+                column_types={name: pyarrow.string() for name in column_names},
+                strings_can_be_null=False
+            )
+        )
+        
+        lengths = [0] * len(original_columns)
+        row_count = 1
+        for batch in reader:
+            if batch.num_rows == 0:
+                continue
+            row_lengths = None
+            for i, column in enumerate(batch.columns):
+                value_lengths = pyarrow_compute.utf8_length(column)
+                batch_max = pyarrow_compute.max(value_lengths).as_py()
+                if batch_max > lengths[i]:
+                    lengths[i] = batch_max
+                row_lengths = value_lengths if row_lengths is None else pyarrow_compute.add(row_lengths, value_lengths)
+            
+            if pyarrow_compute.min(row_lengths).as_py() == 0:
+                raise ValueError(f"row with no characters after row {row_count:,}, possibly a blank line")
+            row_count += batch.num_rows
+        
+        logger.debug(f"Column width analysis completed. Processed {row_count:,} total rows.")
+        
+        return _widths_by_column_name(original_columns, lengths)
     
     @staticmethod
     def _get_cached_metadata(csv_file_path: str, output_dir: str, filename_base: str, overwrite_previous: bool) -> Optional[Dict[str, Any]]:
@@ -536,8 +1061,12 @@ class CSVMetadataExtractor:
             return None  # No metadata, so proceed with generation.
         
         try:
-            with open(json_path, 'r', encoding='utf-8') as jsonfile:
-                existing_metadata = json.load(jsonfile)
+            if orjson is not None:
+                with open(json_path, 'rb') as jsonfile:
+                    existing_metadata = orjson.loads(jsonfile.read())
+            else:
+                with open(json_path, 'r', encoding='utf-8') as jsonfile:
+                    existing_metadata = json.load(jsonfile)
 
             # Check for the override prevention flag FIRST. This is the master switch.
             if not existing_metadata.get('allow_recompile_to_overwrite', True):
@@ -564,24 +1093,46 @@ class CSVMetadataExtractor:
                 print("`--trample` is set, forcing metadata regeneration.")
                 return None  # Force regeneration
 
+            # With content hashing on, identical bytes mean the metadata still applies,
+            # so encoding detection and sniffing can be skipped
+            content_hash = None
+            if _content_hash_enabled() and 'file_content_hash' in existing_metadata:
+                content_hash = _compute_file_content_hash(csv_file_path)
+                if existing_metadata['file_content_hash'] == content_hash:
+                    print(f"Using cached metadata (file content unchanged): {json_path}")
+                    existing_metadata['full_path'] = csv_file_path
+                    CSVMetadataExtractor._validate_column_mapping_uniqueness(existing_metadata)
+                    return existing_metadata
+            
             # Check if the existing metadata has a column headers hash
             if 'column_headers_hash' not in existing_metadata:
                 print(f"Existing metadata lacks column headers hash, regenerating...")
                 return None
             
-            # Get current CSV column headers and generate hash
-            delimiter, quote_char = CSVMetadataExtractor._detect_csv_format(csv_file_path)
-            original_columns, _ = CSVMetadataExtractor._extract_column_names(
-                csv_file_path, delimiter, quote_char
+            # Get current CSV column headers and generate hash, reading with the cached
+            # format first and detecting it again only if that fails
+            original_columns = CSVMetadataExtractor._read_header_with_cached_format(
+                csv_file_path, existing_metadata
             )
+            if original_columns is None:
+                encoding = CSVMetadataExtractor._get_best_encoding(csv_file_path)
+                delimiter, quote_char = CSVMetadataExtractor._detect_csv_format(csv_file_path, encoding)
+                original_columns, _ = CSVMetadataExtractor._extract_column_names(
+                    csv_file_path, delimiter, quote_char, encoding
+                )
             
-            column_headers_str = ','.join([col.lower() for col in original_columns])
-            current_hash = hashlib.md5(column_headers_str.encode()).hexdigest()
+            # Compare with the algorithm the cached hash was made with; older metadata used MD5
+            cached_algorithm = existing_metadata.get('column_headers_hash_algorithm', 'md5')
+            current_hash = _column_headers_hash(original_columns, cached_algorithm)
             
             if existing_metadata['column_headers_hash'] == current_hash:
                 print(f"Using cached metadata (column headers unchanged): {json_path}")
                 existing_metadata['full_path'] = csv_file_path
                 CSVMetadataExtractor._validate_column_mapping_uniqueness(existing_metadata)
+                if _content_hash_enabled():
+                    # Record the hash so the next run can take the content check above
+                    existing_metadata['file_content_hash'] = content_hash or _compute_file_content_hash(csv_file_path)
+                    CSVMetadataExtractor._save_metadata_json(existing_metadata, output_dir, filename_base)
                 return existing_metadata
             else:
                 print(f"Column headers changed, regenerating metadata...")
@@ -591,6 +1142,28 @@ class CSVMetadataExtractor:
             print(f"Error reading cached metadata: {e}, regenerating...")
             return None
     
+    @staticmethod
+    def _read_header_with_cached_format(csv_file_path: str, metadata: Dict[str, Any]) -> Optional[List[str]]:
+        """
+        Read the CSV header using the encoding, delimiter and quote character in cached metadata.
+        
+        Args:
+            csv_file_path (str): Path to the CSV file
+            metadata (Dict[str, Any]): Previously saved metadata
+            
+        Returns:
+            Optional[List[str]]: Original column names, or None if the cached format
+                is missing or cannot read the header
+        """
+        try:
+            with open(csv_file_path, 'r', newline='', encoding=metadata['encoding']) as csvfile:
+                reader = csv.reader(csvfile, delimiter=metadata['delimiter'],
+                                    quotechar=metadata['quote_character'])
+                return next(reader)
+        except (LookupError, UnicodeDecodeError, TypeError, csv.Error, StopIteration) as e:
+            logger.debug(f"Cached CSV format could not read the header ({e}), detecting format...")
+            return None
+    
     @staticmethod
     def _save_metadata_json(metadata: Dict[str, Any], output_dir: str, filename_base: str) -> None:
         """
@@ -608,8 +1181,21 @@ class CSVMetadataExtractor:
         json_filename = f"{filename_base}.metadata.json"
         json_path = os.path.join(output_dir, json_filename)
         
-        # Save metadata to JSON file
-        with open(json_path, 'w', encoding='utf-8') as jsonfile:
-            json.dump(metadata, jsonfile, indent=2, ensure_ascii=False)
+        # Save metadata to JSON file; orjson writes the same indented UTF-8 text, faster.
+        # Written to a temporary file and renamed over the target, so an interrupted
+        # save leaves the previous metadata intact instead of a truncated file.
+        temp_path = f"{json_path}.{os.getpid()}.tmp"
+        try:
+            if orjson is not None:
+                with open(temp_path, 'wb') as jsonfile:
+                    jsonfile.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+            else:
+                with open(temp_path, 'w', encoding='utf-8') as jsonfile:
+                    json.dump(metadata, jsonfile, indent=2, ensure_ascii=False)
+            os.replace(temp_path, json_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
         
-        print(f"Metadata saved to: {json_path}")
+        logger.info("Metadata saved to: %s", json_path)
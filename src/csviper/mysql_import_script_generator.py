@@ -78,11 +78,13 @@ import click
 # Import the shared functionality from csviper package
 try:
     from csviper.import_executor import ImportExecutor
+    from csviper.exceptions import ImportExecutionError
 except ImportError:
     # Fallback for standalone scripts - add the parent directory to path
     import sys
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
     from csviper.import_executor import ImportExecutor
+    from csviper.exceptions import ImportExecutionError
 
 
 @click.command()
@@ -96,13 +98,23 @@ except ImportError:
               help='Table name for the imported data (can be set via DB_TABLE env var)')
 @click.option('--trample', is_flag=True, default=False,
               help='Overwrite existing table data')
-def main(env_file_location, csv_file, db_schema_name, table_name, trample):
+@click.option('--verify_count', is_flag=True, default=False,
+              help='Count the imported rows with SELECT COUNT(*) (scans the whole table)')
+@click.option('--perf_profile', type=click.Choice(['bulk']), default=None,
+              help="'bulk' raises the session's insert, sort and temporary table buffers for the load")
+@click.option('--load_chunks', type=click.IntRange(min=1), default=1,
+              help="Load large files in up to this many parts on separate connections "
+                   "(needs ESCAPED BY '' in the LOAD DATA SQL; parts commit independently)")
+def main(env_file_location, csv_file, db_schema_name, table_name, trample, verify_count, perf_profile, load_chunks):
     """
     Import CSV data into MySQL database using pre-generated SQL scripts.
     
     This script was generated by CSViper for the CSV file: {metadata['filename']}
     """
     try:
+        # Resolve the CSV path once for validation and the import
+        csv_file = ImportExecutor.resolve_csv_path(csv_file)
+        
         # Load and validate configuration
         try:
             db_config, db_schema_name, table_name, metadata, encoding = ImportExecutor.load_and_validate_config(
@@ -110,7 +122,6 @@ def main(env_file_location, csv_file, db_schema_name, table_name, trample):
             )
         except ValueError as e:
             if "too many values to unpack" in str(e):
-                from csviper.exceptions import ImportExecutionError
                 raise ImportExecutionError(
                     "Configuration loading failed due to version mismatch. "
                     "This error typically occurs when the import script expects a different number of return values "
@@ -121,7 +132,6 @@ def main(env_file_location, csv_file, db_schema_name, table_name, trample):
             else:
                 raise
         except Exception as e:
-            from csviper.exceptions import ImportExecutionError
             raise ImportExecutionError(
                 f"Failed to load and validate configuration: {{str(e)}}",
                 script_type="MySQL",
@@ -131,9 +141,10 @@ def main(env_file_location, csv_file, db_schema_name, table_name, trample):
         # Validate CSV header with proper encoding
         try:
             expected_columns = metadata['original_column_names']
-            ImportExecutor.validate_csv_header(csv_file, expected_columns, encoding, use_colors=False)
+            ImportExecutor.validate_csv_header(
+                csv_file, expected_columns, encoding, use_colors=False, delimiter=metadata.get('delimiter', ',')
+            )
         except Exception as e:
-            from csviper.exceptions import ImportExecutionError
             raise ImportExecutionError(
                 f"CSV header validation failed: {{str(e)}}",
                 script_type="MySQL",
@@ -153,8 +164,18 @@ def main(env_file_location, csv_file, db_schema_name, table_name, trample):
         
         # Execute MySQL import using the shared executor
         ImportExecutor.execute_mysql_import(
-            db_config, db_schema_name, table_name, csv_file, trample, 
-            '{csv_basename}.create_table_mysql.sql', '{csv_basename}.import_data_mysql.sql'
+            db_config=db_config,
+            db_schema_name=db_schema_name,
+            table_name=table_name,
+            csv_file=csv_file,
+            trample=trample,
+            create_table_sql_file='{csv_basename}.create_table_mysql.sql',
+            import_data_sql_file='{csv_basename}.import_data_mysql.sql',
+            caller_script_dir=os.path.dirname(os.path.abspath(__file__)),
+            verify_count=verify_count,
+            perf_profile=perf_profile,
+            load_chunks=load_chunks,
+            quote_char=metadata.get('quote_character', '"')
         )
         
         click.echo("✓ MySQL import ran successfully! ")
@@ -2,7 +2,7 @@
 MySQL Schema Generator for CSViper
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List
 from .base_schema_generator import BaseSchemaGenerator
 
 
@@ -32,6 +32,24 @@ class MySQLSchemaGenerator(BaseSchemaGenerator):
             metadata_json_path, output_dir, overwrite_previous, 'mysql', MySQLSchemaGenerator
         )
     
+    @staticmethod
+    def fromMetadataListToSQL(metadata_json_paths: List[str], output_dir: str,
+                              overwrite_previous: bool = False) -> Dict[str, Dict[str, str]]:
+        """
+        Generate MySQL SQL scripts for several metadata JSON files in parallel.
+        
+        Args:
+            metadata_json_paths (List[str]): Paths to the metadata JSON files
+            output_dir (str): Output directory for SQL files
+            overwrite_previous (bool): Whether to overwrite existing files
+            
+        Returns:
+            Dict[str, Dict[str, str]]: Generated file paths for each metadata JSON path
+        """
+        return BaseSchemaGenerator.fromMetadataListToSQL(
+            metadata_json_paths, output_dir, overwrite_previous, 'mysql', MySQLSchemaGenerator
+        )
+    
     @staticmethod
     def _generate_create_table_sql(metadata: Dict[str, Any]) -> str:
         """
@@ -7,10 +7,167 @@ that occur after the initial CSV data import.
 """
 
 import os
+import re
 import json
 import hashlib
-import glob
+import logging
+import functools
+from operator import itemgetter
 from typing import Dict, Any, List, Tuple
+from .atomic_write import write_bytes_atomic
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Numeric execution-order prefix of a post-import SQL file name, e.g. '05_'
+_ORDER_PREFIX_RE = re.compile(r'(\d+)_')
+
+# Number of leading columns that get an index in the index template
+_INDEXED_COLUMN_COUNT = 5
+
+# Per-column statement lines, filled with %-formatting by the template generators
+_MYSQL_INDEX_SQL = "CREATE INDEX `%s` ON REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME (`%s`);\n"
+_POSTGRESQL_INDEX_SQL = 'CREATE INDEX "%s" ON REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME ("%s");\n'
+_NULL_COUNT_SQL = {
+    'mysql': "SELECT '%s' as column_name, COUNT(*) as null_count FROM REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME WHERE `%s` IS NULL OR `%s` = '';\n",
+    'postgresql': "SELECT '%s' as column_name, COUNT(*) as null_count FROM REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME WHERE \"%s\" IS NULL OR \"%s\" = '';\n",
+}
+
+# Fixed text around the per-column statements; templates are header + lines + footer
+_MYSQL_INDEX_TEMPLATE_HEADER = """-- MySQL Post-Import: Create Indexes
+-- Generated by CSViper
+
+"""
+_POSTGRESQL_INDEX_TEMPLATE_HEADER = """-- PostgreSQL Post-Import: Create Indexes
+-- Generated by CSViper
+
+"""
+_INDEX_TEMPLATE_FOOTER = """
+-- Add custom indexes below as needed
+-- Example: CREATE INDEX idx_custom ON REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME (column1, column2);"""
+_VALIDATION_TEMPLATE_HEADER = """-- %s Post-Import: Data Validation
+-- Generated by CSViper
+
+-- Validate row count
+SELECT COUNT(*) as total_rows FROM REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME;
+
+-- Check for null values by column
+"""
+_VALIDATION_TEMPLATE_FOOTER = """
+-- Add custom validation queries below as needed"""
+
+# Statistics templates have no per-column part
+_MYSQL_STATS_TEMPLATE = """-- MySQL Post-Import: Update Statistics
+-- Generated by CSViper
+
+-- Analyze table to update statistics
+ANALYZE TABLE REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME;
+
+-- Add custom statistics or maintenance queries below as needed
+-- Example: OPTIMIZE TABLE REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME;"""
+_POSTGRESQL_STATS_TEMPLATE = """-- PostgreSQL Post-Import: Update Statistics
+-- Generated by CSViper
+
+-- Analyze table to update statistics
+ANALYZE REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME;
+
+-- Add custom statistics or maintenance queries below as needed
+-- Example: VACUUM ANALYZE REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME;"""
+
+
+@functools.lru_cache(maxsize=128)
+def _load_metadata(metadata_json_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """
+    Load and validate a metadata JSON file, memoized per file version.
+    
+    The modification time and size are part of the key so an edited file is
+    read again. Callers must not modify the returned dictionary.
+    
+    Args:
+        metadata_json_path (str): Path to the metadata JSON file
+        mtime_ns (int): File modification time in nanoseconds
+        size (int): File size in bytes
+        
+    Returns:
+        Dict[str, Any]: Parsed metadata
+        
+    Raises:
+        ValueError: If the JSON is invalid or a required field is missing
+    """
+    # orjson is much faster on wide tables when installed
+    if orjson is not None:
+        with open(metadata_json_path, 'rb') as f:
+            metadata = orjson.loads(f.read())
+    else:
+        with open(metadata_json_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+    
+    # Validate required metadata fields
+    required_fields = ['filename_without_extension', 'normalized_column_names']
+    for field in required_fields:
+        if field not in metadata:
+            raise ValueError(f"Required metadata field missing: {field}")
+    
+    return metadata
+
+
+@functools.lru_cache(maxsize=8)
+def _read_readme_template(database_type: str) -> str:
+    """
+    Read the packaged post-import README template for a database type, once per process.
+    
+    Args:
+        database_type (str): Database type ('mysql' or 'postgresql')
+        
+    Returns:
+        str: Unformatted template text
+        
+    Raises:
+        FileNotFoundError: If template file is not found
+    """
+    # Get the directory where this module is located
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    template_dir = os.path.join(module_dir, 'templates')
+    
+    # Load the appropriate template file
+    template_file = os.path.join(template_dir, f"{database_type}.post_import_sql.ReadMe.md")
+    
+    if not os.path.exists(template_file):
+        raise FileNotFoundError(f"README template not found: {template_file}")
+    
+    with open(template_file, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@functools.lru_cache(maxsize=64)
+def _null_check_sql(column_names: Tuple[str, ...], database_type: str) -> str:
+    """
+    Build the per-column null checks of the validation template.
+    
+    Tables with the same normalized columns (e.g. monthly snapshots of one feed)
+    share the result.
+    
+    Args:
+        column_names (Tuple[str, ...]): Normalized column names
+        database_type (str): Database type ('mysql' or 'postgresql')
+        
+    Returns:
+        str: One null-count query per line
+    """
+    null_count_sql = _NULL_COUNT_SQL['mysql' if database_type == 'mysql' else 'postgresql']
+    return "".join(
+        null_count_sql % (col_name, col_name, col_name)
+        for col_name in column_names
+    )
+
+
+def clear_metadata_cache():
+    """Forget metadata files loaded by PostImportSQLGenerator."""
+    _load_metadata.cache_clear()
 
 
 class PostImportSQLGenerator:
@@ -47,32 +204,26 @@ class PostImportSQLGenerator:
         if not os.path.isfile(metadata_json_path):
             raise FileNotFoundError(f"Metadata JSON file not found: {metadata_json_path}")
         
-        # Load metadata
-        with open(metadata_json_path, 'r', encoding='utf-8') as f:
-            metadata = json.load(f)
+        # Load and validate metadata, reusing the parse while the file is unchanged
+        metadata_stat = os.stat(metadata_json_path)
+        metadata = _load_metadata(metadata_json_path, metadata_stat.st_mtime_ns, metadata_stat.st_size)
         
-        # Validate required metadata fields
-        required_fields = ['filename_without_extension', 'normalized_column_names']
-        for field in required_fields:
-            if field not in metadata:
-                raise ValueError(f"Required metadata field missing: {field}")
-        
-        print(f"Generating {database_type.upper()} post-import SQL for: {metadata['filename_without_extension']}")
+        logger.info("Generating %s post-import SQL for: %s",
+                    database_type.upper(), metadata['filename_without_extension'])
         
         # Create post-import SQL directory
         post_import_dir = os.path.join(output_dir, 'post_import_sql')
         os.makedirs(post_import_dir, exist_ok=True)
         
-        # Generate MD5 hash for column structure caching
-        column_names_str = ','.join([col.lower() for col in metadata['normalized_column_names']])
-        column_md5_hash = hashlib.md5(column_names_str.encode()).hexdigest()
+        # Hash the column structure to name the cached SQL directory
+        column_hash = PostImportSQLGenerator._column_structure_hash(metadata)
         
         # Generate post-import SQL files
         post_import_files = PostImportSQLGenerator._get_or_create_post_import_sql(
-            metadata, post_import_dir, column_md5_hash, database_type, overwrite_previous
+            metadata, post_import_dir, column_hash, database_type, overwrite_previous
         )
         
-        print(f"Generated {len(post_import_files)} post-import SQL files")
+        logger.info("Generated %d post-import SQL files", len(post_import_files))
         
         return {
             'post_import_dir': post_import_dir,
@@ -80,9 +231,32 @@ class PostImportSQLGenerator:
             'database_type': database_type
         }
     
+    @staticmethod
+    def _column_structure_hash(metadata: Dict[str, Any]) -> str:
+        """
+        Hash the normalized column names to name the table's post-import SQL directory.
+        
+        The names are fed to the hasher one at a time instead of being joined
+        first. The bytes hashed are the same as for the comma-joined lowercased
+        names and the digest is MD5, so existing directories, which may hold
+        customized SQL, keep being found.
+        
+        Args:
+            metadata (Dict[str, Any]): CSV metadata
+            
+        Returns:
+            str: 32-character hex digest
+        """
+        hasher = hashlib.md5()
+        for i, col in enumerate(metadata['normalized_column_names']):
+            if i:
+                hasher.update(b',')
+            hasher.update(col.lower().encode())
+        return hasher.hexdigest()
+    
     @staticmethod
     def _get_or_create_post_import_sql(metadata: Dict[str, Any], post_import_dir: str,
-                                      column_md5_hash: str, database_type: str, 
+                                      column_hash: str, database_type: str, 
                                       overwrite_previous: bool) -> List[str]:
         """
         Get post-import SQL files from cache or generate new ones.
@@ -90,7 +264,7 @@ class PostImportSQLGenerator:
         Args:
             metadata (Dict[str, Any]): CSV metadata
             post_import_dir (str): Post-import SQL directory path
-            column_md5_hash (str): MD5 hash of column structure
+            column_hash (str): Hash of column structure, from _column_structure_hash
             database_type (str): Database type ('mysql' or 'postgresql')
             overwrite_previous (bool): Whether to overwrite existing cache
             
@@ -98,34 +272,38 @@ class PostImportSQLGenerator:
             List[str]: List of generated post-import SQL file paths
         """
         # Create subdirectory for this specific table structure
-        table_hash_dir = os.path.join(post_import_dir, f"{metadata['filename_without_extension']}_{column_md5_hash}")
+        table_hash_dir = os.path.join(post_import_dir, f"{metadata['filename_without_extension']}_{column_hash}")
         os.makedirs(table_hash_dir, exist_ok=True)
         
         # Look for existing post-import SQL files
-        existing_files = glob.glob(os.path.join(table_hash_dir, f"*.{database_type}.sql"))
+        suffix = f".{database_type}.sql"
+        with os.scandir(table_hash_dir) as entries:
+            existing_files = [entry.path for entry in entries
+                              if entry.name.endswith(suffix) and entry.is_file()]
         
         if existing_files and not overwrite_previous:
             # Use existing files
-            print(f"Using existing {database_type.upper()} post-import SQL files: {len(existing_files)} files")
+            logger.info("Using existing %s post-import SQL files: %d files",
+                        database_type.upper(), len(existing_files))
             return sorted(existing_files)
         
         # Generate new post-import SQL files
-        print(f"Generating new {database_type.upper()} post-import SQL files...")
+        logger.info("Generating new %s post-import SQL files...", database_type.upper())
         
         post_import_templates = PostImportSQLGenerator._get_post_import_templates(metadata, database_type)
-        generated_files = []
+        payloads = [
+            (os.path.join(table_hash_dir, f"{template_info['order']:02d}_{template_info['name']}.{database_type}.sql"),
+             template_info['sql'])
+            for template_info in post_import_templates
+        ]
         
-        for template_info in post_import_templates:
-            filename = f"{template_info['order']:02d}_{template_info['name']}.{database_type}.sql"
-            filepath = os.path.join(table_hash_dir, filename)
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(template_info['sql'])
-            
-            generated_files.append(filepath)
-            print(f"Generated: {filename}")
+        # Same atomic raw-descriptor writer as the generated schema files
+        for filepath, data in payloads:
+            write_bytes_atomic(filepath, data)
+        
+        logger.info("Generated %d SQL files in %s", len(payloads), table_hash_dir)
         
-        return generated_files
+        return [filepath for filepath, _ in payloads]
     
     @staticmethod
     def _get_post_import_templates(metadata: Dict[str, Any], database_type: str) -> List[Dict[str, Any]]:
@@ -137,7 +315,8 @@ class PostImportSQLGenerator:
             database_type (str): Database type ('mysql' or 'postgresql')
             
         Returns:
-            List[Dict[str, Any]]: List of template dictionaries with 'order', 'name', and 'sql' keys
+            List[Dict[str, Any]]: List of template dictionaries with 'order', 'name', and 'sql' keys,
+                where 'sql' is the UTF-8 encoded file content
         """
         templates = []
         
@@ -150,7 +329,7 @@ class PostImportSQLGenerator:
         templates.append({
             'order': 1,
             'name': 'create_indexes',
-            'sql': index_sql
+            'sql': index_sql.encode('utf-8')
         })
         
         # Data validation template (runs after indexing)
@@ -158,7 +337,7 @@ class PostImportSQLGenerator:
         templates.append({
             'order': 5,
             'name': 'data_validation',
-            'sql': validation_sql
+            'sql': validation_sql.encode('utf-8')
         })
         
         # Statistics update template (runs last)
@@ -170,7 +349,7 @@ class PostImportSQLGenerator:
         templates.append({
             'order': 10,
             'name': 'update_statistics',
-            'sql': stats_sql
+            'sql': stats_sql.encode('utf-8')
         })
         
         return templates
@@ -178,102 +357,41 @@ class PostImportSQLGenerator:
     @staticmethod
     def _generate_mysql_index_template(metadata: Dict[str, Any]) -> str:
         """Generate MySQL index creation template."""
-        sql_parts = []
-        sql_parts.append("-- MySQL Post-Import: Create Indexes")
-        sql_parts.append("-- Generated by CSViper")
-        sql_parts.append("")
-        
         # Create indexes on columns that might be commonly queried
         # This is a basic template - users can customize as needed
-        for i, col_name in enumerate(metadata['normalized_column_names'][:5]):  # First 5 columns
-            index_name = f"idx_{col_name}"[:64]  # MySQL index name limit
-            sql_parts.append(f"CREATE INDEX `{index_name}` ON REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME (`{col_name}`);")
-        
-        sql_parts.append("")
-        sql_parts.append("-- Add custom indexes below as needed")
-        sql_parts.append("-- Example: CREATE INDEX idx_custom ON REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME (column1, column2);")
-        
-        return "\n".join(sql_parts)
+        index_sql = "".join(
+            _MYSQL_INDEX_SQL % (f"idx_{col_name}"[:64], col_name)  # MySQL index name limit
+            for col_name in metadata['normalized_column_names'][:_INDEXED_COLUMN_COUNT]
+        )
+        return _MYSQL_INDEX_TEMPLATE_HEADER + index_sql + _INDEX_TEMPLATE_FOOTER
     
     @staticmethod
     def _generate_postgresql_index_template(metadata: Dict[str, Any]) -> str:
         """Generate PostgreSQL index creation template."""
-        sql_parts = []
-        sql_parts.append("-- PostgreSQL Post-Import: Create Indexes")
-        sql_parts.append("-- Generated by CSViper")
-        sql_parts.append("")
-        
         # Create indexes on columns that might be commonly queried
         # This is a basic template - users can customize as needed
-        for i, col_name in enumerate(metadata['normalized_column_names'][:5]):  # First 5 columns
-            index_name = f"idx_{col_name}"[:63]  # PostgreSQL index name limit
-            sql_parts.append(f'CREATE INDEX "{index_name}" ON REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME ("{col_name}");')
-        
-        sql_parts.append("")
-        sql_parts.append("-- Add custom indexes below as needed")
-        sql_parts.append('-- Example: CREATE INDEX idx_custom ON REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME (column1, column2);')
-        
-        return "\n".join(sql_parts)
+        index_sql = "".join(
+            _POSTGRESQL_INDEX_SQL % (f"idx_{col_name}"[:63], col_name)  # PostgreSQL index name limit
+            for col_name in metadata['normalized_column_names'][:_INDEXED_COLUMN_COUNT]
+        )
+        return _POSTGRESQL_INDEX_TEMPLATE_HEADER + index_sql + _INDEX_TEMPLATE_FOOTER
     
     @staticmethod
     def _generate_validation_template(metadata: Dict[str, Any], database_type: str) -> str:
         """Generate data validation template."""
-        sql_parts = []
-        sql_parts.append(f"-- {database_type.upper()} Post-Import: Data Validation")
-        sql_parts.append("-- Generated by CSViper")
-        sql_parts.append("")
-        
-        # Basic row count validation
-        sql_parts.append("-- Validate row count")
-        sql_parts.append("SELECT COUNT(*) as total_rows FROM REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME;")
-        sql_parts.append("")
-        
-        # Check for null values in each column
-        sql_parts.append("-- Check for null values by column")
-        for col_name in metadata['normalized_column_names']:
-            if database_type == 'mysql':
-                sql_parts.append(f"SELECT '{col_name}' as column_name, COUNT(*) as null_count FROM REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME WHERE `{col_name}` IS NULL OR `{col_name}` = '';")
-            else:  # postgresql
-                sql_parts.append(f"SELECT '{col_name}' as column_name, COUNT(*) as null_count FROM REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME WHERE \"{col_name}\" IS NULL OR \"{col_name}\" = '';")
-        
-        sql_parts.append("")
-        sql_parts.append("-- Add custom validation queries below as needed")
-        
-        return "\n".join(sql_parts)
+        # Row count, then a null check for each column
+        null_checks = _null_check_sql(tuple(metadata['normalized_column_names']), database_type)
+        return _VALIDATION_TEMPLATE_HEADER % database_type.upper() + null_checks + _VALIDATION_TEMPLATE_FOOTER
     
     @staticmethod
     def _generate_mysql_stats_template(metadata: Dict[str, Any]) -> str:
         """Generate MySQL statistics update template."""
-        sql_parts = []
-        sql_parts.append("-- MySQL Post-Import: Update Statistics")
-        sql_parts.append("-- Generated by CSViper")
-        sql_parts.append("")
-        
-        sql_parts.append("-- Analyze table to update statistics")
-        sql_parts.append("ANALYZE TABLE REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME;")
-        sql_parts.append("")
-        
-        sql_parts.append("-- Add custom statistics or maintenance queries below as needed")
-        sql_parts.append("-- Example: OPTIMIZE TABLE REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME;")
-        
-        return "\n".join(sql_parts)
+        return _MYSQL_STATS_TEMPLATE
     
     @staticmethod
     def _generate_postgresql_stats_template(metadata: Dict[str, Any]) -> str:
         """Generate PostgreSQL statistics update template."""
-        sql_parts = []
-        sql_parts.append("-- PostgreSQL Post-Import: Update Statistics")
-        sql_parts.append("-- Generated by CSViper")
-        sql_parts.append("")
-        
-        sql_parts.append("-- Analyze table to update statistics")
-        sql_parts.append("ANALYZE REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME;")
-        sql_parts.append("")
-        
-        sql_parts.append("-- Add custom statistics or maintenance queries below as needed")
-        sql_parts.append("-- Example: VACUUM ANALYZE REPLACE_ME_DATABASE_NAME.REPLACE_ME_TABLE_NAME;")
-        
-        return "\n".join(sql_parts)
+        return _POSTGRESQL_STATS_TEMPLATE
     
     @staticmethod
     def load_readme_template(database_type: str, filename_base: str) -> str:
@@ -290,21 +408,8 @@ class PostImportSQLGenerator:
         Raises:
             FileNotFoundError: If template file is not found
         """
-        # Get the directory where this module is located
-        module_dir = os.path.dirname(os.path.abspath(__file__))
-        template_dir = os.path.join(module_dir, 'templates')
-        
-        # Load the appropriate template file
-        template_file = os.path.join(template_dir, f"{database_type}.post_import_sql.ReadMe.md")
-        
-        if not os.path.exists(template_file):
-            raise FileNotFoundError(f"README template not found: {template_file}")
-        
-        with open(template_file, 'r', encoding='utf-8') as f:
-            template_content = f.read()
-        
         # Format the template with the filename_base
-        return template_content.format(filename_base=filename_base)
+        return _read_readme_template(database_type).format(filename_base=filename_base)
     
     @staticmethod
     def get_ordered_post_import_files(post_import_dir: str, database_type: str) -> List[Tuple[int, str]]:
@@ -321,23 +426,29 @@ class PostImportSQLGenerator:
         if not os.path.exists(post_import_dir):
             return []
         
-        files_with_order = []
-        
-        # Look for SQL files in subdirectories
-        for root, dirs, files in os.walk(post_import_dir):
-            for filename in files:
-                if filename.endswith(f'.{database_type}.sql'):
-                    # Extract numeric prefix
-                    try:
-                        order_str = filename.split('_')[0]
-                        order = int(order_str)
-                        filepath = os.path.join(root, filename)
-                        files_with_order.append((order, filepath))
-                    except (ValueError, IndexError):
-                        # Skip files that don't follow the naming convention
-                        continue
-        
-        # Sort by order
-        files_with_order.sort(key=lambda x: x[0])
-        
-        return files_with_order
+        suffix = f'.{database_type}.sql'
+        
+        def scan(directory):
+            # One scandir per directory; DirEntry caches the file type from the listing.
+            # Like os.walk: files before subdirectories, symlinked directories not
+            # followed, unreadable directories skipped.
+            try:
+                with os.scandir(directory) as entries:
+                    entries = list(entries)
+            except OSError:
+                return
+            subdirs = []
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        subdirs.append(entry.path)
+                elif entry.name.endswith(suffix):
+                    # Extract numeric prefix; skip files that don't follow the naming convention
+                    order_match = _ORDER_PREFIX_RE.match(entry.name)
+                    if order_match:
+                        yield int(order_match.group(1)), entry.path
+            for subdir in subdirs:
+                yield from scan(subdir)
+        
+        # Look for SQL files in subdirectories, sorted by order
+        return sorted(scan(post_import_dir), key=itemgetter(0))
@@ -77,12 +77,14 @@ import click
 
 # Import the shared functionality from csviper package
 try:
-    from csviper.import_executor import ImportExecutor
+    from csviper.import_executor import ImportExecutor, Colors
+    from csviper.exceptions import ImportExecutionError
 except ImportError:
     # Fallback for standalone scripts - add the parent directory to path
     import sys
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
-    from csviper.import_executor import ImportExecutor
+    from csviper.import_executor import ImportExecutor, Colors
+    from csviper.exceptions import ImportExecutionError
 
 
 @click.command()
@@ -111,6 +113,9 @@ def main(env_file_location, csv_file, db_schema_name, table_name, trample, impor
             if not isinstance(import_only_lines, int) or import_only_lines <= 0:
                 raise click.BadParameter('Value must be a whole positive number.', param_hint='--import_only_lines')
 
+        # Resolve the CSV path once for validation and the import
+        csv_file = ImportExecutor.resolve_csv_path(csv_file)
+        
         # Load and validate configuration
         try:
             db_config, db_schema_name, table_name, metadata, encoding = ImportExecutor.load_and_validate_config(
@@ -118,7 +123,6 @@ def main(env_file_location, csv_file, db_schema_name, table_name, trample, impor
             )
         except ValueError as e:
             if "too many values to unpack" in str(e):
-                from csviper.exceptions import ImportExecutionError
                 raise ImportExecutionError(
                     "Configuration loading failed due to version mismatch. "
                     "This error typically occurs when the import script expects a different number of return values "
@@ -129,7 +133,6 @@ def main(env_file_location, csv_file, db_schema_name, table_name, trample, impor
             else:
                 raise
         except Exception as e:
-            from csviper.exceptions import ImportExecutionError
             raise ImportExecutionError(
                 f"Failed to load and validate configuration: {{str(e)}}",
                 script_type="PostgreSQL",
@@ -139,9 +142,10 @@ def main(env_file_location, csv_file, db_schema_name, table_name, trample, impor
         # Validate CSV header with proper encoding
         try:
             expected_columns = metadata['original_column_names']
-            ImportExecutor.validate_csv_header(csv_file, expected_columns, encoding)
+            ImportExecutor.validate_csv_header(
+                csv_file, expected_columns, encoding, delimiter=metadata.get('delimiter', ',')
+            )
         except Exception as e:
-            from csviper.exceptions import ImportExecutionError
             raise ImportExecutionError(
                 f"CSV header validation failed: {{str(e)}}",
                 script_type="PostgreSQL",
@@ -168,13 +172,13 @@ def main(env_file_location, csv_file, db_schema_name, table_name, trample, impor
             trample=trample,
             create_table_sql_file='{csv_basename}.create_table_postgres.sql',
             encoding=encoding,
-            import_only_lines=import_only_lines
+            import_only_lines=import_only_lines,
+            caller_script_dir=os.path.dirname(os.path.abspath(__file__))
         )
         
         click.echo("✓ PostgreSQL import ran successfully!")
         
     except Exception as e:
-        from csviper.import_executor import Colors
         click.echo(Colors.dark_red(f"Error: {{e}}"), err=True)
         sys.exit(1)
 
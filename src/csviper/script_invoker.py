@@ -3,12 +3,31 @@ Script Invoker for CSViper - Handles dynamic file discovery and script execution
 """
 
 import os
+import re
 import glob
 import json
+import fnmatch
+import datetime
+import functools
 import subprocess
 import sys
-from typing import Dict, Any, List, Optional
-from .exceptions import CSViperError, FileSystemError, MetadataError
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from .exceptions import CSViperError, ConfigurationError, FileSystemError, MetadataError
+
+
+# Generated import script for each supported database type
+_SCRIPT_BY_DB = {
+    'mysql': 'go.mysql.py',
+    'postgresql': 'go.postgresql.py',
+}
+
+# Units for human-readable file sizes, in powers of 1024
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+# Accepted answers for the file confirmation prompt
+_YES_RESPONSES = frozenset(('', 'y', 'yes'))
+_NO_RESPONSES = frozenset(('n', 'no'))
 
 
 class CompiledScriptInvoker:
@@ -21,7 +40,9 @@ class CompiledScriptInvoker:
                             database_type: str, db_schema_name: Optional[str] = None,
                             table_name: Optional[str] = None,
                             import_only_lines: Optional[int] = None,
-                            trample: bool = False) -> None:
+                            trample: bool = False,
+                            replace_process: bool = False,
+                            assume_yes: bool = False) -> None:
         """
         Main entry point for directory-based import invocation.
         
@@ -32,6 +53,9 @@ class CompiledScriptInvoker:
             db_schema_name (Optional[str]): Database schema name to pass to the import script
             table_name (Optional[str]): Table name to pass to the import script
             import_only_lines (Optional[int]): Limit the import to a specific number of lines
+            replace_process (bool): Replace the current process with the import script
+                instead of waiting on a child process
+            assume_yes (bool): Use the selected file without prompting for confirmation
             
         Raises:
             CSViperError: If any step of the process fails
@@ -48,21 +72,22 @@ class CompiledScriptInvoker:
             metadata = CompiledScriptInvoker._load_directory_metadata(run_import_from)
             
             # 2. Find latest matching data file
-            latest_file = CompiledScriptInvoker._find_latest_data_file(
+            latest_file, latest_stat = CompiledScriptInvoker._find_latest_data_file(
                 import_data_from_dir, 
                 metadata['file_glob_pattern'],
-                metadata.get('recursive_search', True)
+                metadata['recursive_search']
             )
             
             # 3. Confirm with user
-            if not CompiledScriptInvoker._confirm_file_selection(latest_file, metadata):
+            if not CompiledScriptInvoker._confirm_file_selection(latest_file, latest_stat, metadata,
+                                                                  assume_yes):
                 print("Operation cancelled by user.")
                 return
             
             # 4. Execute the import script
             CompiledScriptInvoker._execute_import_script(
                 run_import_from, latest_file, database_type, db_schema_name, table_name,
-                import_only_lines, trample
+                import_only_lines, trample, replace_process
             )
             
         except Exception as e:
@@ -106,23 +131,17 @@ class CompiledScriptInvoker:
             with open(metadata_file, 'r', encoding='utf-8') as f:
                 metadata = json.load(f)
             
-            # Validate required fields for invoker functionality
-            required_fields = ['file_glob_pattern']
-            missing_fields = [field for field in required_fields if field not in metadata]
-            
-            if missing_fields:
-                print(f"Warning: Metadata file missing invoker fields: {missing_fields}")
-                print(f"Using fallback values...")
+            # Provide fallback values for backward compatibility with older metadata
+            if 'file_glob_pattern' not in metadata:
+                print("Warning: Metadata file missing invoker fields: ['file_glob_pattern']")
+                print("Using fallback values...")
                 
-                # Provide fallback values for backward compatibility
-                if 'file_glob_pattern' not in metadata:
-                    if 'filename' in metadata:
-                        metadata['file_glob_pattern'] = metadata['filename']
-                    else:
-                        raise MetadataError("Metadata file missing both 'file_glob_pattern' and 'filename' fields")
-                
-                if 'recursive_search' not in metadata:
-                    metadata['recursive_search'] = True
+                pattern = metadata.get('filename')
+                if not pattern:
+                    raise MetadataError("Metadata file missing both 'file_glob_pattern' and 'filename' fields")
+                metadata['file_glob_pattern'] = pattern
+            
+            metadata.setdefault('recursive_search', True)
             
             return metadata
             
@@ -132,7 +151,7 @@ class CompiledScriptInvoker:
             raise MetadataError(f"Error reading metadata file {metadata_file}: {e}")
     
     @staticmethod
-    def _find_latest_data_file(search_dir: str, pattern: str, recursive: bool) -> str:
+    def _find_latest_data_file(search_dir: str, pattern: str, recursive: bool) -> Tuple[str, os.stat_result]:
         """
         Find the most recently modified file matching the pattern.
         
@@ -142,7 +161,8 @@ class CompiledScriptInvoker:
             recursive (bool): Whether to search recursively
             
         Returns:
-            str: Path to the most recently modified matching file
+            Tuple[str, os.stat_result]: Path to the most recently modified matching
+            file and its stat result
             
         Raises:
             FileSystemError: If no matching files are found or search fails
@@ -150,14 +170,21 @@ class CompiledScriptInvoker:
         print(f"Searching for files matching '{pattern}' in {search_dir}...")
         
         try:
-            if recursive:
-                # Search recursively through subdirectories
-                search_pattern = os.path.join(search_dir, "**", pattern)
-                matching_files = glob.glob(search_pattern, recursive=True)
+            if os.sep in pattern or (os.altsep and os.altsep in pattern):
+                # Patterns that span directories still need full glob semantics
+                if recursive:
+                    search_pattern = os.path.join(search_dir, "**", pattern)
+                    matching_files = glob.glob(search_pattern, recursive=True)
+                else:
+                    search_pattern = os.path.join(search_dir, pattern)
+                    matching_files = glob.glob(search_pattern)
             else:
-                # Search only in the top-level directory
-                search_pattern = os.path.join(search_dir, pattern)
-                matching_files = glob.glob(search_pattern)
+                # Translate the pattern once and match it against entry names
+                # while walking the tree ourselves
+                pattern_re = re.compile(fnmatch.translate(pattern))
+                matching_files = CompiledScriptInvoker._scan_matching_files(
+                    search_dir, pattern_re, recursive, pattern.startswith('.')
+                )
             
             if not matching_files:
                 raise FileSystemError(
@@ -165,41 +192,99 @@ class CompiledScriptInvoker:
                     f"Recursive search: {recursive}"
                 )
             
+            # Stat each candidate exactly once; the results drive both the
+            # sort and the listing below
+            if len(matching_files) > 1 and os.environ.get('CSVIPER_REMOTE_STAT') == '1':
+                # On network filesystems each stat is a round-trip, so overlap them
+                with ThreadPoolExecutor(max_workers=min(8, len(matching_files))) as executor:
+                    stats = list(executor.map(os.stat, matching_files))
+            else:
+                stats = [os.stat(f) for f in matching_files]
+            file_stats = list(zip(matching_files, stats))
+
             # Sort by modification time (newest first)
-            matching_files.sort(key=lambda f: os.path.getmtime(f), reverse=True)
-            
-            print(f"Found {len(matching_files)} matching file(s):")
-            for i, file_path in enumerate(matching_files[:5]):  # Show up to 5 files
-                mtime = os.path.getmtime(file_path)
-                size = os.path.getsize(file_path)
+            file_stats.sort(key=lambda item: item[1].st_mtime, reverse=True)
+
+            print(f"Found {len(file_stats)} matching file(s):")
+            for i, (file_path, st) in enumerate(file_stats[:5]):  # Show up to 5 files
                 print(f"  {i+1}. {os.path.basename(file_path)} "
-                      f"({CompiledScriptInvoker._format_file_size(size)}, "
-                      f"modified: {CompiledScriptInvoker._format_timestamp(mtime)})")
-            
-            if len(matching_files) > 5:
-                print(f"  ... and {len(matching_files) - 5} more files")
-            
-            return matching_files[0]  # Return the most recent file
+                      f"({CompiledScriptInvoker._format_file_size(st.st_size)}, "
+                      f"modified: {CompiledScriptInvoker._format_timestamp(st.st_mtime)})")
+
+            if len(file_stats) > 5:
+                print(f"  ... and {len(file_stats) - 5} more files")
+
+            return file_stats[0]  # Return the most recent file with its stat
             
         except Exception as e:
             raise FileSystemError(f"Error searching for files: {e}")
     
     @staticmethod
-    def _confirm_file_selection(file_path: str, metadata: Dict[str, Any]) -> bool:
+    def _scan_matching_files(search_dir: str, pattern_re: "re.Pattern", recursive: bool,
+                             include_hidden: bool = False) -> List[str]:
+        """
+        Collect files whose names match a precompiled pattern using os.scandir.
+        
+        Mirrors glob semantics: hidden entries are skipped unless the pattern
+        itself starts with a dot, and unreadable subdirectories are ignored.
+        
+        Args:
+            search_dir (str): Directory to search in
+            pattern_re (re.Pattern): Compiled regex from fnmatch.translate
+            recursive (bool): Whether to descend into subdirectories
+            include_hidden (bool): Whether dot-prefixed entries may match
+            
+        Returns:
+            List[str]: Paths of matching files
+        """
+        matching_files = []
+        pending_dirs = [search_dir]
+        
+        while pending_dirs:
+            current_dir = pending_dirs.pop()
+            try:
+                with os.scandir(current_dir) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        if name.startswith('.') and not include_hidden:
+                            continue
+                        if entry.is_dir():
+                            if recursive:
+                                pending_dirs.append(entry.path)
+                        elif pattern_re.match(name):
+                            matching_files.append(entry.path)
+            except OSError:
+                if current_dir == search_dir:
+                    raise
+        
+        return matching_files
+    
+    @staticmethod
+    def _confirm_file_selection(file_path: str, file_stat: os.stat_result,
+                                metadata: Dict[str, Any], assume_yes: bool = False) -> bool:
         """
         Present file to user for confirmation.
         
+        The prompt is skipped when assume_yes is set. Without it, stdin must be a
+        terminal: piped or redirected input (cron, orchestrators, IDE consoles) is
+        refused rather than read as an answer or taken as consent.
+        
         Args:
             file_path (str): Path to the selected file
+            file_stat (os.stat_result): Stat result already gathered for the file
             metadata (Dict[str, Any]): Metadata dictionary for context
+            assume_yes (bool): Accept the file without prompting
             
         Returns:
             bool: True if user confirms, False if user cancels
+            
+        Raises:
+            ConfigurationError: If confirmation is needed but stdin is not a terminal
         """
         print(f"\nLatest file selected:")
         print(f"  Path: {file_path}")
-        print(f"  Size: {CompiledScriptInvoker._format_file_size(os.path.getsize(file_path))}")
-        print(f"  Modified: {CompiledScriptInvoker._format_timestamp(os.path.getmtime(file_path))}")
+        print(f"  Size: {CompiledScriptInvoker._format_file_size(file_stat.st_size)}")
+        print(f"  Modified: {CompiledScriptInvoker._format_timestamp(file_stat.st_mtime)}")
         
         # Show some context from metadata
         if 'total_columns' in metadata:
@@ -209,11 +294,21 @@ class CompiledScriptInvoker:
         
         print()
         
+        if assume_yes:
+            print("Proceeding without confirmation (--assume_yes).")
+            return True
+        
+        if not sys.stdin.isatty():
+            raise ConfigurationError(
+                "Cannot ask for confirmation because standard input is not a terminal. "
+                "Pass --assume_yes to import the selected file without asking."
+            )
+        
         while True:
             response = input("Use this file for import? [Y/n]: ").strip().lower()
-            if response in ['', 'y', 'yes']:
+            if response in _YES_RESPONSES:
                 return True
-            elif response in ['n', 'no']:
+            elif response in _NO_RESPONSES:
                 return False
             else:
                 print("Please enter 'y' for yes or 'n' for no.")
@@ -223,10 +318,16 @@ class CompiledScriptInvoker:
                              db_schema_name: Optional[str] = None, 
                              table_name: Optional[str] = None,
                              import_only_lines: Optional[int] = None,
-                             trample: bool = False) -> None:
+                             trample: bool = False,
+                             replace_process: bool = False) -> None:
         """
         Execute go.mysql.py or go.postgresql.py with the CSV file.
         
+        With replace_process=True the script is started via os.execv, so the
+        current Python process (and all of its state) is discarded and this
+        method never returns. Use the default subprocess path when the caller
+        needs the exit code.
+        
         Args:
             script_dir (str): Directory containing the import scripts
             csv_file (str): Path to the CSV file to import
@@ -234,17 +335,15 @@ class CompiledScriptInvoker:
             db_schema_name (Optional[str]): Database schema name to pass to the import script
             table_name (Optional[str]): Table name to pass to the import script
             import_only_lines (Optional[int]): Limit the import to a specific number of lines
+            replace_process (bool): Replace the current process instead of spawning a child
             
         Raises:
             FileSystemError: If import script is not found
             CSViperError: If script execution fails
         """
         # Determine script filename based on database type
-        if db_type.lower() == 'mysql':
-            script_name = 'go.mysql.py'
-        elif db_type.lower() == 'postgresql':
-            script_name = 'go.postgresql.py'
-        else:
+        script_name = _SCRIPT_BY_DB.get(db_type.lower())
+        if script_name is None:
             raise CSViperError(f"Unsupported database type: {db_type}")
         
         script_path = os.path.join(script_dir, script_name)
@@ -255,18 +354,18 @@ class CompiledScriptInvoker:
                 f"Expected to find {script_name} in {script_dir}"
             )
         
-        # Build command to execute
-        cmd = [sys.executable, script_path, f"--csv_file={csv_file}"]
+        # Build command to execute, passing option values as separate arguments
+        cmd = [sys.executable, script_path, "--csv_file", csv_file]
         
         # Add optional arguments if provided
         if db_schema_name:
-            cmd.append(f"--db_schema_name={db_schema_name}")
+            cmd.extend(("--db_schema_name", db_schema_name))
         
         if table_name:
-            cmd.append(f"--table_name={table_name}")
+            cmd.extend(("--table_name", table_name))
 
         if import_only_lines:
-            cmd.append(f"--import_only_lines={import_only_lines}")
+            cmd.extend(("--import_only_lines", str(import_only_lines)))
         
         if trample:
             cmd.append("--trample")
@@ -276,13 +375,24 @@ class CompiledScriptInvoker:
         print(f"  Working directory: {script_dir}")
         print()
         
+        if replace_process:
+            # Nothing runs after the script, so hand the process over to it
+            sys.stdout.flush()
+            sys.stderr.flush()
+            try:
+                os.chdir(script_dir)
+                os.execv(sys.executable, cmd)
+            except OSError as e:
+                raise CSViperError(f"Error executing import script: {e}")
+        
         try:
-            # Execute the script
+            # Execute the script; output goes straight to the console and the
+            # child never waits on terminal input
             result = subprocess.run(
                 cmd,
                 cwd=script_dir,
-                capture_output=False,  # Let output go to console
-                text=True
+                stdin=subprocess.DEVNULL,
+                check=False
             )
             
             if result.returncode != 0:
@@ -296,6 +406,7 @@ class CompiledScriptInvoker:
             raise CSViperError(f"Unexpected error during script execution: {e}")
     
     @staticmethod
+    @functools.lru_cache(maxsize=256)
     def _format_file_size(size_bytes: float) -> str:
         """
         Format file size in human-readable format.
@@ -306,13 +417,12 @@ class CompiledScriptInvoker:
         Returns:
             str: Formatted file size
         """
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} PB"
+        # Each unit step is 10 bits, so the unit follows from the bit length
+        unit_index = min((max(int(size_bytes), 1).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+        return f"{size_bytes / (1 << (unit_index * 10)):.1f} {_SIZE_UNITS[unit_index]}"
     
     @staticmethod
+    @functools.lru_cache(maxsize=256)
     def _format_timestamp(timestamp: float) -> str:
         """
         Format timestamp in human-readable format.
@@ -323,6 +433,5 @@ class CompiledScriptInvoker:
         Returns:
             str: Formatted timestamp
         """
-        import datetime
         dt = datetime.datetime.fromtimestamp(timestamp)
         return dt.strftime("%Y-%m-%d %H:%M:%S")
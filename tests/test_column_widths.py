@@ -0,0 +1,50 @@
+"""
+Column width analysis must give the same result with and without pyarrow.
+"""
+
+import pytest
+
+import csviper.metadata_extractor as metadata_extractor
+from csviper.metadata_extractor import CSVMetadataExtractor
+from csviper.exceptions import CSVValidationError
+
+
+@pytest.fixture(params=["pyarrow", "csv"])
+def width_scan(request, monkeypatch):
+    """Run the width scan with pyarrow, or with the csv module only."""
+    if request.param == "pyarrow":
+        if metadata_extractor.pyarrow is None:
+            pytest.skip("pyarrow is not installed")
+    else:
+        monkeypatch.setattr(metadata_extractor, "pyarrow", None)
+
+    def scan(path, columns):
+        return CSVMetadataExtractor._analyze_column_widths(
+            str(path), ',', '"', columns, columns, 'utf-8'
+        )
+
+    return scan
+
+
+@pytest.mark.parametrize("content, columns, expected", [
+    ("a,b,c\n1,22,333\n", ["a", "b", "c"], {"a": 1, "b": 2, "c": 3}),
+    ("a,b,c\n1,2,3\n,,\n4,5,6\n", ["a", "b", "c"], {"a": 1, "b": 1, "c": 1}),
+    ('a\n1\n""\n22\n', ["a"], {"a": 2}),
+    ("a,b\n", ["a", "b"], {"a": 0, "b": 0}),
+])
+def test_widths(width_scan, tmp_path, content, columns, expected):
+    path = tmp_path / "data.csv"
+    path.write_text(content, encoding='utf-8')
+    assert width_scan(path, columns) == expected
+
+
+@pytest.mark.parametrize("content, columns", [
+    ("a,b,c\n1,2,3\n\n4,5,6\n", ["a", "b", "c"]),
+    ("a\n1\n\n2\n", ["a"]),
+    ("a,b\n1,2\n3\n", ["a", "b"]),
+])
+def test_inconsistent_rows_fail(width_scan, tmp_path, content, columns):
+    path = tmp_path / "data.csv"
+    path.write_text(content, encoding='utf-8')
+    with pytest.raises(CSVValidationError, match="Inconsistent column count at row 3"):
+        width_scan(path, columns)
@@ -0,0 +1,58 @@
+"""
+CSV files must split into byte ranges that start and end on record boundaries.
+"""
+
+import csv
+import io
+
+import pytest
+
+import csviper.csv_ranges as csv_ranges
+from csviper.csv_ranges import split_csv_ranges
+
+
+def read_records(data, ranges, quotechar='"'):
+    """Parse each range on its own and return all records in order."""
+    records = []
+    for start, end in ranges:
+        text = data[start:end].decode('utf-8')
+        records.extend(csv.reader(io.StringIO(text, newline=''), quotechar=quotechar))
+    return records
+
+
+@pytest.fixture(params=[1 << 20, 7])
+def read_size(request, monkeypatch):
+    """Scan in one read, or in reads small enough that quotes and newlines straddle them."""
+    monkeypatch.setattr(csv_ranges, "_BOUNDARY_SCAN_READ_SIZE", request.param)
+    return request.param
+
+
+@pytest.mark.parametrize("n_chunks", [1, 2, 3, 5, 50])
+def test_ranges_cover_file_on_record_boundaries(read_size, tmp_path, n_chunks):
+    data = b"".join(b'%d,"multi\nline %d",x\n' % (i, i) for i in range(20))
+    path = tmp_path / "data.csv"
+    path.write_bytes(data)
+
+    ranges = split_csv_ranges(str(path), n_chunks)
+
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+    assert len(ranges) <= n_chunks
+    assert read_records(data, ranges) == read_records(data, [(0, len(data))])
+
+
+def test_quote_character_is_honoured(read_size, tmp_path):
+    data = b"".join(b"%d,'a\nb\"',y\n" % i for i in range(20))
+    path = tmp_path / "data.csv"
+    path.write_bytes(data)
+
+    ranges = split_csv_ranges(str(path), 4, b"'")
+
+    assert len(ranges) > 1
+    assert read_records(data, ranges, "'") == read_records(data, [(0, len(data))], "'")
+
+
+def test_empty_file_has_no_ranges(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"")
+    assert split_csv_ranges(str(path), 4) == []
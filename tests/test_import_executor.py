@@ -0,0 +1,237 @@
+"""
+Tests for the import executor's helpers that don't need a database server.
+"""
+
+import os
+import types
+
+import pytest
+
+pymysql = pytest.importorskip("pymysql")
+
+import csviper.import_executor as import_executor
+
+
+class FakeConnection:
+    """Collects the packets a LOAD DATA LOCAL sender writes."""
+
+    def __init__(self, max_allowed_packet):
+        self.max_allowed_packet = max_allowed_packet
+        self.packets = []
+
+    def write_packet(self, data):
+        self.packets.append(data)
+
+
+@pytest.fixture
+def send_local_file(monkeypatch):
+    """The LOAD DATA LOCAL sender csviper installs, installed into a stand-in pymysql."""
+    connections = types.SimpleNamespace(_send_local_file=None)
+    fake_pymysql = types.SimpleNamespace(connections=connections, err=pymysql.err, constants=pymysql.constants)
+    monkeypatch.setattr(import_executor, "_LOAD_LOCAL_SENDER_INSTALLED", False)
+    import_executor._install_load_local_sender(fake_pymysql)
+    return connections._send_local_file
+
+
+def test_sender_sends_whole_file(send_local_file, tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"a,b\n1,2\n3,4\n")
+    conn = FakeConnection(max_allowed_packet=5)
+
+    send_local_file(str(path), conn)
+
+    assert all(len(packet) <= 5 for packet in conn.packets)
+    assert b"".join(conn.packets) == b"a,b\n1,2\n3,4\n"
+
+
+def test_sender_sends_registered_part(send_local_file, tmp_path, monkeypatch):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"a,b\n1,2\n3,4\n5,6\n")
+    part_name = f"{path}.part1"
+    monkeypatch.setitem(import_executor._LOCAL_INFILE_PARTS, part_name, (str(path), 8, 12))
+    conn = FakeConnection(max_allowed_packet=3)
+
+    send_local_file(part_name, conn)
+
+    assert all(len(packet) <= 3 for packet in conn.packets)
+    assert b"".join(conn.packets) == b"3,4\n"
+
+
+def test_sender_reports_missing_file(send_local_file, tmp_path):
+    with pytest.raises(pymysql.err.OperationalError, match="Can't open file"):
+        send_local_file(str(tmp_path / "missing.csv"), FakeConnection(max_allowed_packet=1024))
+
+
+@pytest.mark.parametrize("sql, unescaped", [
+    ("LOAD DATA LOCAL INFILE 'x' INTO TABLE t FIELDS ENCLOSED BY '\"' ESCAPED BY ''", True),
+    ("LOAD DATA LOCAL INFILE 'x' INTO TABLE t FIELDS ENCLOSED BY '\"'", False),
+    ("LOAD DATA LOCAL INFILE 'x' INTO TABLE t FIELDS ESCAPED BY '\\\\'", False),
+    ("LOAD DATA LOCAL INFILE 'x' INTO TABLE t FIELDS ESCAPED BY ''''", False),
+])
+def test_split_loads_need_escaping_off(sql, unescaped):
+    assert bool(import_executor._NO_ESCAPE_RE.search(sql)) is unescaped
+
+
+def test_post_import_scan_follows_file_links_only(tmp_path):
+    post_import_dir = tmp_path / "post_import_sql"
+    (post_import_dir / "nested").mkdir(parents=True)
+    (post_import_dir / "nested" / "20_index.sql").write_text("SELECT 1;")
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "10_linked.sql").write_text("SELECT 1;")
+    (outside / "30_hidden.sql").write_text("SELECT 1;")
+    (post_import_dir / "10_linked.sql").symlink_to(outside / "10_linked.sql")
+    (post_import_dir / "linked_dir").symlink_to(outside, target_is_directory=True)
+
+    files = import_executor._scan_post_import_sql_files(str(tmp_path), 'mysql')
+
+    assert [os.path.basename(path) for _, path in files] == ["10_linked.sql", "20_index.sql"]
+
+
+class FailingFile:
+    """Text file stand-in whose second read fails."""
+
+    name = "failing.csv"
+    mode = "r"
+    encoding = "utf-8"
+    closed = False
+
+    def __init__(self):
+        self.reads = 0
+
+    def fileno(self):
+        raise OSError("no file descriptor")
+
+    def read(self, size=-1):
+        self.reads += 1
+        if self.reads > 1:
+            raise OSError("disk error")
+        return "a,b\n"
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize("chunk_size, read_size", [(4, 3), (5, 100), (1 << 20, -1)])
+def test_read_ahead_returns_file_then_eof(tmp_path, chunk_size, read_size):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n3,4\n", encoding='utf-8')
+
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = import_executor._ReadAheadReader(f, chunk_size)
+        try:
+            parts = []
+            while True:
+                data = reader.read(read_size)
+                if not data:
+                    break
+                assert read_size < 0 or len(data) <= read_size
+                parts.append(data)
+            assert "".join(parts) == "a,b\n1,2\n3,4\n"
+            assert reader.read(read_size) == ""
+        finally:
+            reader.close()
+
+
+def test_read_ahead_raises_read_errors():
+    reader = import_executor._ReadAheadReader(FailingFile(), 4)
+    try:
+        assert reader.read(4) == "a,b\n"
+        with pytest.raises(OSError, match="disk error"):
+            reader.read(4)
+    finally:
+        reader.close()
+
+
+class RecordingConnection:
+    """psycopg2 connection stand-in that records what runs on it."""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.log = []
+
+    def cursor(self):
+        connection = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, sql):
+                connection.log.append(sql)
+
+        return Cursor()
+
+    def commit(self):
+        self.log.append("COMMIT")
+
+
+def test_postgresql_connections_turn_off_synchronous_commit(monkeypatch):
+    monkeypatch.setattr(import_executor, "_psycopg2", types.SimpleNamespace(connect=RecordingConnection))
+
+    connection = import_executor._connect_postgresql({'host': 'db', 'database': 'csv'})
+
+    assert connection.kwargs == {'host': 'db', 'database': 'csv'}
+    assert connection.log == ["SET synchronous_commit = off", "COMMIT"]
+
+
+@pytest.mark.parametrize("dialect, sql, expected", [
+    # Semicolons in strings, identifiers and comments don't end statements
+    ("postgresql", "SELECT 'a;b'; SELECT \"c;d\"", ["SELECT 'a;b'", "SELECT \"c;d\""]),
+    ("mysql", "SELECT 'a;b'; SELECT `c;d`", ["SELECT 'a;b'", "SELECT `c;d`"]),
+    ("postgresql", "SELECT 'it''s;'; SELECT 2", ["SELECT 'it''s;'", "SELECT 2"]),
+    ("postgresql", "-- one; two\nSELECT 1; /* three; */ SELECT 2;", ["SELECT 1", "SELECT 2"]),
+    ("postgresql", "-- only a comment;\n/* and another */", []),
+    # Dollar quoting is PostgreSQL's
+    ("postgresql",
+     "CREATE FUNCTION f() RETURNS int AS $body$ SELECT 1; $body$ LANGUAGE sql; SELECT $$;$$",
+     ["CREATE FUNCTION f() RETURNS int AS $body$ SELECT 1; $body$ LANGUAGE sql", "SELECT $$;$$"]),
+    # A backslash escapes a quote in MySQL and in PostgreSQL E'' strings only
+    ("mysql", "SELECT 'a\\';b'; SELECT 2", ["SELECT 'a\\';b'", "SELECT 2"]),
+    ("postgresql", "SELECT 'C:\\'; SELECT 2", ["SELECT 'C:\\'", "SELECT 2"]),
+    ("postgresql", "SELECT E'a\\';b'; SELECT 2", ["SELECT E'a\\';b'", "SELECT 2"]),
+    ("postgresql", "SELECT name'C:\\'; SELECT 2", ["SELECT name'C:\\'", "SELECT 2"]),
+])
+def test_sql_statement_splitting(dialect, sql, expected):
+    assert list(import_executor._iter_sql_statements(sql, dialect)) == expected
+
+
+class SavepointlessConnection(RecordingConnection):
+    """Connection whose savepoints can't be rolled back to, and where one statement fails."""
+
+    def cursor(self):
+        connection = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, sql):
+                connection.log.append(sql)
+                if "BAD" in sql or sql.startswith("ROLLBACK TO SAVEPOINT"):
+                    raise RuntimeError("statement failed")
+
+        return Cursor()
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+
+
+def test_post_import_falls_back_to_rollback(tmp_path):
+    path = tmp_path / "10_indexes.sql"
+    path.write_text("SELECT 1; SELECT BAD; SELECT 3;")
+    connection = SavepointlessConnection()
+
+    import_executor.ImportExecutor._execute_post_import_file(
+        connection, str(path), lambda match: match.group(0), False, True, 'postgresql'
+    )
+
+    # The batch fails, each rollback falls back to the whole transaction, and later statements still run
+    assert connection.log[-3:] == ["SELECT 3", "RELEASE SAVEPOINT csviper_post_import", "COMMIT"]
+    assert connection.log.count("ROLLBACK") == 2
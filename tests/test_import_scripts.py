@@ -0,0 +1,57 @@
+"""
+Generated import scripts must pass their command-line options through to the import executor.
+"""
+
+import pytest
+from click.testing import CliRunner
+
+from csviper.import_executor import ImportExecutor
+from csviper.mysql_import_script_generator import MySQLImportScriptGenerator
+
+
+METADATA = {
+    'filename': 'data.csv',
+    'original_column_names': ['a', 'b'],
+    'delimiter': ',',
+    'quote_character': "'",
+}
+
+
+@pytest.fixture
+def mysql_import(monkeypatch):
+    """Run the generated go.mysql.py command and return the arguments it imports with."""
+    calls = []
+    monkeypatch.setattr(ImportExecutor, "resolve_csv_path", staticmethod(lambda csv_file: csv_file))
+    monkeypatch.setattr(ImportExecutor, "load_and_validate_config", staticmethod(
+        lambda *args, **kwargs: ({}, 'schema', 'table', METADATA, 'utf-8')
+    ))
+    monkeypatch.setattr(ImportExecutor, "validate_csv_header", staticmethod(lambda *args, **kwargs: None))
+    monkeypatch.setattr(ImportExecutor, "execute_mysql_import", staticmethod(lambda **kwargs: calls.append(kwargs)))
+
+    namespace = {'__name__': 'go_mysql', '__file__': 'go.mysql.py'}
+    exec(MySQLImportScriptGenerator._generate_script_content(METADATA), namespace)
+
+    def run(*args):
+        result = CliRunner().invoke(namespace['main'], ['--csv_file', 'data.csv', *args])
+        assert result.exit_code == 0, result.output
+        assert len(calls) == 1
+        return calls[0]
+
+    return run
+
+
+def test_mysql_defaults(mysql_import):
+    kwargs = mysql_import()
+    assert kwargs['verify_count'] is False
+    assert kwargs['perf_profile'] is None
+    assert kwargs['load_chunks'] == 1
+
+
+def test_mysql_perf_profile(mysql_import):
+    assert mysql_import('--perf_profile', 'bulk')['perf_profile'] == 'bulk'
+
+
+def test_mysql_load_chunks_use_the_file_quote_character(mysql_import):
+    kwargs = mysql_import('--load_chunks', '4')
+    assert kwargs['load_chunks'] == 4
+    assert kwargs['quote_char'] == "'"